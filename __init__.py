@@ -7,14 +7,23 @@ uv_loop_tools/
 │   ├─ spline.py
 │   ├─ equalize.py
 │   └─ match3d.py
+├─ cache.py
 ├─ panels.py
 ├─ preferences.py
 ├─ properties.py
+├─ resample.py
+├─ snapshot.py
+├─ spatial.py
+├─ topology.py
 ├─ translation.py
 ├─ utils.py
+├─ weld.py
 ├─ blender_manifest.toml
 ├─ icons/
 │   └─ ...
+├─ benchmarks/
+│   ├─ snapshot_scan.py
+│   └─ spline_idle.py
 ├─ README.md
 └─ LICENSE
 
@@ -32,6 +41,7 @@ bl_info = {
 # ルートに残すモジュール（非-operators）
 from . import (
     properties,
+    cache,
     utils,
     panels,
     preferences,
@@ -44,6 +54,7 @@ from . import operators
 
 MODULES = (
     properties,
+    cache,
     utils,
     operators,
     panels,
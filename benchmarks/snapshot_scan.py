@@ -0,0 +1,96 @@
+# benchmarks/snapshot_scan.py
+"""
+take_snapshot の走査時間を実際の Blender で測るスクリプト。
+    blender --background --factory-startup --python benchmarks/snapshot_scan.py -- [面数] [選択面数]
+グリッドメッシュを作って編集モードに入り、先頭から指定数の面を選択して
+その面のループを UV エッジ選択にしてから、selected_only=True / False の走査時間を比べる。
+selected_only=True も全ての面の選択フラグを Python で調べる（選択面だけを辿る API は無い）ので、
+差は選択外の面のループ読み取りを省いた分だけになる。
+このスクリプトはまだ実行しておらず、面ごとの絞り込みの効果は未計測。
+"""
+import importlib.util
+import os
+import sys
+import time
+
+import bmesh
+import bpy
+
+
+def _load_snapshot():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshot.py")
+    spec = importlib.util.spec_from_file_location("ult_snapshot", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    faces = int(argv[0]) if len(argv) > 0 else 2_000_000
+    selected = int(argv[1]) if len(argv) > 1 else 4_000
+    return faces, selected
+
+
+def build_mesh(faces, selected):
+    side = max(1, int(round(faces ** 0.5)))
+    me = bpy.data.meshes.new("ult_bench")
+    obj = bpy.data.objects.new("ult_bench", me)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=side, y_segments=side, size=1.0, calc_uvs=True)
+    bm.to_mesh(me)
+    bm.free()
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.context.scene.tool_settings.use_uv_select_sync = False
+    bm = bmesh.from_edit_mesh(me)
+    uv_layer = bm.loops.layers.uv.verify()
+    for f in bm.faces:
+        f.select_set(False)
+    bm.faces.ensure_lookup_table()
+    for i in range(min(selected, len(bm.faces))):
+        f = bm.faces[i]
+        f.select_set(True)
+        for l in f.loops:
+            if hasattr(l, "uv_select_edge"):
+                l.uv_select_edge = True
+            else:
+                l[uv_layer].select_edge = True
+    bmesh.update_edit_mesh(me)
+    return obj, len(bm.faces)
+
+
+def _time(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def main():
+    snapshot = _load_snapshot()
+    faces, selected = _args()
+    obj, num_faces = build_mesh(faces, selected)
+    me = obj.data
+
+    def scan(selected_only):
+        bm = bmesh.from_edit_mesh(me)
+        uv_layer = bm.loops.layers.uv.verify()
+        return snapshot.take_snapshot(bm, uv_layer, selected_only=selected_only)
+
+    t_all, snap_all = _time(lambda: scan(False))
+    t_sel, snap_sel = _time(lambda: scan(True))
+    print(f"faces={num_faces} selected={selected} blender={bpy.app.version_string}")
+    print(f"take_snapshot selected_only=False: {t_all:.3f} s ({len(snap_all)} loops)")
+    print(f"take_snapshot selected_only=True : {t_sel:.3f} s ({len(snap_sel)} loops)")
+
+
+if __name__ == "__main__":
+    main()
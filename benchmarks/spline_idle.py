@@ -0,0 +1,114 @@
+# benchmarks/spline_idle.py
+"""
+スプライン調整モーダルの待機中のオーバーヘッドを実際の Blender で数えるスクリプト。
+    blender --factory-startup --python benchmarks/spline_idle.py -- [待機秒数] [分割数]
+モーダルにはウィンドウが要るので --background では動かない。アドオンを有効にした状態で実行する。
+グリッドメッシュを作って 1 行分のエッジを UV エッジ選択にし、先頭のエリアを UV エディタに
+切り替えてモーダルを起動する。何も操作せずに指定秒数待ち、その間の TIMER イベント数・
+モーダル呼び出し数・draw_callback の回数と合計時間を表示して終了する。
+変更前後の比較は、それぞれのコミットをチェックアウトして同じ引数で実行する。
+"""
+import sys
+import time
+
+import bmesh
+import bpy
+
+
+def _args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    seconds = float(argv[0]) if len(argv) > 0 else 10.0
+    segments = int(argv[1]) if len(argv) > 1 else 24
+    return seconds, segments
+
+
+def build_mesh(segments):
+    me = bpy.data.meshes.new("ult_bench")
+    obj = bpy.data.objects.new("ult_bench", me)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=segments, y_segments=segments, size=1.0, calc_uvs=True)
+    bm.to_mesh(me)
+    bm.free()
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.context.scene.tool_settings.use_uv_select_sync = False
+    bm = bmesh.from_edit_mesh(me)
+    uv_layer = bm.loops.layers.uv.verify()
+    # 中央の行の横方向のエッジだけを選択する
+    row = sorted({round(v.co.y, 6) for v in bm.verts})[segments // 2]
+    for f in bm.faces:
+        f.select_set(True)
+        for l in f.loops:
+            a, b = l.vert.co, l.link_loop_next.vert.co
+            on_row = round(a.y, 6) == row and round(b.y, 6) == row
+            if hasattr(l, "uv_select_edge"):
+                l.uv_select_edge = on_row
+            else:
+                l[uv_layer].select_edge = on_row
+    bmesh.update_edit_mesh(me)
+    return obj
+
+
+def _instrument(cls, counts):
+    modal = cls.modal
+    draw = cls.draw_callback
+
+    def counted_modal(self, context, event):
+        counts["modal"] += 1
+        if event.type == 'TIMER':
+            counts["timer"] += 1
+        return modal(self, context, event)
+
+    def timed_draw(self, context):
+        t0 = time.perf_counter()
+        try:
+            return draw(self, context)
+        finally:
+            counts["draw"] += 1
+            counts["draw_time"] += time.perf_counter() - t0
+
+    cls.modal = counted_modal
+    cls.draw_callback = timed_draw
+
+
+def main():
+    seconds, segments = _args()
+    cls = getattr(bpy.types, "UV_OT_spline_adjust_modal", None)
+    if cls is None:
+        print("UV Loop Tools is not enabled")
+        return
+    build_mesh(segments)
+
+    window = bpy.context.window_manager.windows[0]
+    area = max(window.screen.areas, key=lambda a: a.width * a.height)
+    area.type = 'IMAGE_EDITOR'
+    area.ui_type = 'UV'
+    region = next(r for r in area.regions if r.type == 'WINDOW')
+
+    counts = {"modal": 0, "timer": 0, "draw": 0, "draw_time": 0.0}
+    _instrument(cls, counts)
+
+    def start():
+        with bpy.context.temp_override(window=window, area=area, region=region):
+            bpy.ops.uv.spline_adjust_modal('INVOKE_DEFAULT')
+        bpy.app.timers.register(report, first_interval=seconds)
+        return None
+
+    def report():
+        per_draw = counts["draw_time"] / counts["draw"] * 1e3 if counts["draw"] else 0.0
+        print(f"idle {seconds:.1f} s segments={segments} blender={bpy.app.version_string}")
+        print(f"modal calls : {counts['modal']} (TIMER {counts['timer']})")
+        print(f"draw_callback: {counts['draw']} calls, {counts['draw_time'] * 1e3:.1f} ms total ({per_draw:.2f} ms each)")
+        bpy.ops.wm.quit_blender()
+        return None
+
+    # 起動直後はウィンドウの準備ができていないので、最初のイベントループを待ってから起動する
+    bpy.app.timers.register(start, first_interval=0.5)
+
+
+if __name__ == "__main__":
+    main()
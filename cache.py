@@ -0,0 +1,238 @@
+# cache.py
+"""
+選択 UV トポロジー（グラフ・連結成分・パス）のオブジェクト単位キャッシュ。
+キーは (メッシュ識別子, 選択・UV 配列のチェックサム, グラフ許容誤差)。
+保持するのはスナップショットのスロット番号で表したグラフとパスだけ（BMLoop は持たない）なので、
+F9 のやり直しで BMesh が作り直されても、選択と UV が同じなら再利用できる。
+同じキーで均等化ソルバーの反復状態も保持する（solver_state / store_solver_state）。
+頂点座標はメッシュ単位の連続配列（geometry_buffers）として保持し、depsgraph の
+ジオメトリ更新で破棄する。UV だけを書き換えた更新（mark_uv_update）では破棄せず、
+次に使うときに座標のチェックサムで照合する（印が残って本当の編集の通知を取り違えても
+古い座標を返さない）。
+"""
+import hashlib
+from collections import OrderedDict
+
+import bpy
+from bpy.app.handlers import persistent
+from mathutils import Vector
+
+from . import topology
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_ENTRIES = 8
+
+
+def mesh_identity(me):
+    """メッシュ ID の識別子（session_uid が無ければポインタ、最後は名前）"""
+    try:
+        return ("uid", int(me.session_uid))
+    except Exception:
+        pass
+    try:
+        return ("ptr", me.as_pointer())
+    except Exception:
+        return ("name", getattr(me, "name", id(me)))
+
+
+def snapshot_checksum(snap):
+    """スナップショットの面・面内位置・選択・UV 配列のチェックサム（スナップショットごとに 1 回だけ計算）"""
+    if snap.checksum is not None:
+        return snap.checksum
+    h = hashlib.blake2b(digest_size=16)
+    if np is not None:
+        for arr in (snap.face, snap.corner, snap.sel, snap.uv):
+            h.update(np.ascontiguousarray(arr).tobytes())
+    else:
+        h.update(repr((snap.face, snap.corner, snap.sel, snap.uv)).encode())
+    snap.checksum = h.digest()
+    return snap.checksum
+
+
+class TopologyCache:
+    """LRU で上限 max_entries 件まで保持する"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = TopologyCache()
+# 反復ソルバーの途中状態（F9 のやり直しで続きから計算する用）
+_solver_cache = TopologyCache(max_entries=4)
+
+
+def selection_topology(me, snap, graph_tol):
+    """
+    (UVGraph, Topology) を返す。選択・UV・許容誤差が前回と同じならキャッシュを再利用。
+    me が None の場合はキャッシュせずに構築する。
+    """
+    key = None
+    if me is not None:
+        key = (mesh_identity(me), snapshot_checksum(snap), float(graph_tol))
+        entry = _cache.get(key)
+        if entry is not None:
+            return entry
+    uv_graph = topology.build_uv_graph(snap, graph_tol)
+    topo = topology.Topology(uv_graph.num_nodes, uv_graph.edges)
+    topo.extract_paths()
+    entry = (uv_graph, topo)
+    if key is not None:
+        _cache.put(key, entry)
+    return entry
+
+
+def solver_state(me, snap, params):
+    """
+    前回の実行で保存した反復ソルバーを返す（無ければ None）。
+    params: 結果に影響するパラメータ（許容誤差・ループ種別・収束判定など）のタプル
+    """
+    if me is None:
+        return None
+    return _solver_cache.get((mesh_identity(me), snapshot_checksum(snap), params))
+
+
+def store_solver_state(me, snap, params, solver):
+    if me is None or solver is None:
+        return
+    _solver_cache.put((mesh_identity(me), snapshot_checksum(snap), params), solver)
+
+
+class GeometryBuffers:
+    """
+    メッシュの頂点座標の連続配列。
+    co        : (V, 3) float64（NumPy が無い環境ではタプルのリスト）
+    num_verts : 構築時の頂点数（ハンドラを経ない頂点の増減の検出用）
+    checksum  : 座標のチェックサム（UV だけの更新の後の照合用）
+    """
+    __slots__ = ("co", "num_verts", "checksum")
+
+    def __init__(self, co):
+        self.num_verts = len(co)
+        self.co = np.array(co, dtype=np.float64).reshape(-1, 3) if np is not None else co
+        self.checksum = _coords_checksum(self.co)
+
+    def points(self, verts):
+        """頂点インデックス列の座標（NumPy があれば (n, 3) 配列、無ければ Vector のリスト）"""
+        if np is not None:
+            return self.co[np.asarray(verts, dtype=np.int64)]
+        co = self.co
+        return [Vector(co[i]) for i in verts]
+
+
+def _coords_checksum(co):
+    h = hashlib.blake2b(digest_size=16)
+    if np is not None:
+        h.update(np.ascontiguousarray(co, dtype=np.float64).tobytes())
+    else:
+        h.update(repr(co).encode())
+    return h.digest()
+
+
+_geometry = {}
+# UV だけを書き換えて update_edit_mesh したメッシュ（次のジオメトリ更新通知を 1 回無視する）
+_uv_only = set()
+# 印でジオメトリ更新の通知を無視したメッシュ（次に使うときに座標を照合する）
+_unverified = set()
+
+
+def geometry_buffers(me, bm):
+    """メッシュの GeometryBuffers（ジオメトリが変わっていなければ前回のものを再利用）"""
+    key = mesh_identity(me)
+    geo = _geometry.get(key)
+    if geo is not None and geo.num_verts == len(bm.verts) and key not in _unverified:
+        return geo
+    _unverified.discard(key)
+    fresh = GeometryBuffers([v.co[:] for v in bm.verts])
+    if geo is None or fresh.checksum != geo.checksum:
+        _geometry[key] = geo = fresh
+    return geo
+
+
+def mark_uv_update(me):
+    """UV だけを書き換えた update_edit_mesh の直前に呼ぶ（頂点座標バッファを保持する）"""
+    _uv_only.add(mesh_identity(me))
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    if not _geometry:
+        _uv_only.clear()
+        _unverified.clear()
+        return
+    touched = set()
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        data = update.id.original
+        if isinstance(data, bpy.types.Object):
+            data = data.data
+        if isinstance(data, bpy.types.Mesh):
+            touched.add(mesh_identity(data))
+    for key in touched:
+        if key in _uv_only:
+            _uv_only.discard(key)
+            # 同じ通知に頂点の編集が含まれていても区別できないので、使う前に座標を照合する
+            if key in _geometry:
+                _unverified.add(key)
+        else:
+            _geometry.pop(key, None)
+            _unverified.discard(key)
+
+
+@persistent
+def _on_undo(*_args):
+    # アンドゥ／リドゥでは座標が戻り得るので全て破棄
+    _geometry.clear()
+    _uv_only.clear()
+    _unverified.clear()
+
+
+_HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update),
+    (bpy.app.handlers.undo_post, _on_undo),
+    (bpy.app.handlers.redo_post, _on_undo),
+)
+
+
+def clear():
+    _cache.clear()
+    _solver_cache.clear()
+    _geometry.clear()
+    _uv_only.clear()
+    _unverified.clear()
+
+
+def register():
+    for handlers, fn in _HANDLERS:
+        if fn not in handlers:
+            handlers.append(fn)
+
+
+def unregister():
+    for handlers, fn in _HANDLERS:
+        if fn in handlers:
+            handlers.remove(fn)
+    clear()
@@ -1,9 +1,8 @@
 ﻿# operators/equalize.py
 import bpy
 import bmesh
-from mathutils import Vector
 from bpy.app.translations import pgettext as pgett
-from .. import utils
+from .. import utils, snapshot, weld, cache
 
 
 class UV_OT_loop_equalize(bpy.types.Operator):
@@ -12,27 +11,32 @@ class UV_OT_loop_equalize(bpy.types.Operator):
     bl_description = "Evenly redistribute selected UV edge loops"
     bl_options = {'UNDO'}
 
-    closed_loop = bpy.props.EnumProperty(
+    closed_loop: bpy.props.EnumProperty(
         name="Loop Type",
         description="Specify if auto-detection fails",
         items=[('AUTO','Auto','Auto detect'),('OPEN','Open','Treat as open loop'),('CLOSED','Closed','Treat as closed loop')],
         default='AUTO'
     )
 
-    weld_tolerance = bpy.props.FloatProperty(
+    weld_tolerance: bpy.props.FloatProperty(
         name="Weld tolerance",
         description="Precision for treating UVs as identical",
         min=1e-8, max=1e-2, default=1e-6, subtype='FACTOR'
     )
 
-    iter_mode = bpy.props.EnumProperty(
+    iter_mode: bpy.props.EnumProperty(
         name="Iteration Mode",
         items=[('AUTO','Auto','Auto until converge'), ('COUNT','Count','Fixed iterations')],
         default='AUTO'
     )
-    iter_count = bpy.props.IntProperty(name="Iterations", min=1, max=100, default=5)
-    auto_max_iter = bpy.props.IntProperty(name="Auto max iterations", min=1, max=25, default=12)
-    converge_epsilon = bpy.props.FloatProperty(name="Converge epsilon", min=1e-9, max=1e-2, default=1e-6)
+    iter_count: bpy.props.IntProperty(name="Iterations", min=1, max=100, default=5)
+    auto_max_iter: bpy.props.IntProperty(name="Auto max iterations", min=1, max=25, default=12)
+    converge_epsilon: bpy.props.FloatProperty(name="Converge epsilon", min=1e-9, max=1e-2, default=1e-6)
+    repeat_closed_only: bpy.props.BoolProperty(
+        name="Closed loops only",
+        description="Repeat only closed loops; open loops are equalized once",
+        default=True
+    )
 
     def _safe_int(self, name, default=5):
         try:
@@ -54,6 +58,13 @@ class UV_OT_loop_equalize(bpy.types.Operator):
     def execute(self, context):
         weld_tolerance = self._safe_float('weld_tolerance', 1e-6)
         converge_epsilon = self._safe_float('converge_epsilon', 1e-6)
+        if getattr(self, 'iter_mode', 'AUTO') == 'COUNT':
+            max_iter = self._safe_int('iter_count', 5)
+            conv_eps = -1.0  # 固定回数
+        else:
+            max_iter = self._safe_int('auto_max_iter', 12)
+            conv_eps = converge_epsilon
+        repeat_closed_only = bool(getattr(self, 'repeat_closed_only', True))
 
         ts = getattr(context, 'tool_settings', None)
         if ts and getattr(ts, 'use_uv_select_sync', False):
@@ -77,15 +88,11 @@ class UV_OT_loop_equalize(bpy.types.Operator):
         count_closed = 0
 
         graph_tol = min(weld_tolerance * 0.25, 5e-7)
-        def uv_key_graph(v):
-            s = int(round(1.0 / max(graph_tol, 1e-12)))
-            return (int(round(v.x * s)), int(round(v.y * s)))
-        def uv_key_weld(v):
-            s = int(round(1.0 / max(weld_tolerance, 1e-12)))
-            return (int(round(v.x * s)), int(round(v.y * s)))
 
         for obj in objs:
             me = obj.data
+            if not snapshot.mesh_has_selection(me):
+                continue
             try:
                 bm = bmesh.from_edit_mesh(me)
             except Exception:
@@ -93,103 +100,77 @@ class UV_OT_loop_equalize(bpy.types.Operator):
                 continue
             uv_layer = bm.loops.layers.uv.verify()
 
-            graph = {}
-            uv_to_loops = {}
-            found = False
-            for f in bm.faces:
-                if f.hide: continue
-                for l in f.loops:
-                    luv = l[uv_layer]
-                    ln = l.link_loop_next
-                    luvn = ln[uv_layer]
-
-                    if utils.uv_edge_selected(l, uv_layer):
-                        p = Vector(luv.uv)
-                        q = Vector(luvn.uv)
-                        a = uv_key_graph(p)
-                        b = uv_key_graph(q)
-                        uv_to_loops.setdefault(a, []).append(l)
-                        uv_to_loops.setdefault(b, []).append(ln)
-                        graph.setdefault(a, set()).add(b)
-                        graph.setdefault(b, set()).add(a)
-                        found = True
-
-            if not found:
-                continue
-
-            comps = utils.connected_components_keys(graph)
-            if not comps:
-                skipped += 1
+            snap = snapshot.take_snapshot(bm, uv_layer)
+            uv_graph, topo = cache.selection_topology(me, snap, graph_tol)
+            if not uv_graph.num_edges:
                 continue
+            welds = weld.build_weld_index(snap, uv_layer, uv_graph.all_slots(), weld_tolerance)
 
+            snap_uv = snap.uv_list()
             def read_uvs(keys):
-                pts = []
-                for k in keys:
-                    L = uv_to_loops.get(k, [])
-                    if not L: return None
-                    pts.append(Vector(L[0][uv_layer].uv))
-                return pts
-
-            for comp in comps:
-                sub = {k: set(nei for nei in graph.get(k, set()) if nei in comp) for k in comp}
-                paths = utils.extract_paths_from_component(sub)
-                if not paths:
+                return [tuple(snap_uv[uv_graph.node_slot[k]]) for k in keys]
+
+            # 全パスを連結座標 + offsets にまとめ、1 回のカーネル呼び出しで均等化する
+            batch_keys = []
+            batch_closed = []
+            batch_iters = []
+            coords = []
+            offsets = [0]
+            for ordered_keys, _is_cycle, _comp in topo.extract_paths():
+                if self.closed_loop == 'OPEN':
+                    is_closed = False
+                elif self.closed_loop == 'CLOSED':
+                    is_closed = True
+                else:
+                    is_closed = topo.is_simple_cycle(ordered_keys)
+
+                if len(set(ordered_keys)) <= 2:
                     skipped += 1
                     continue
 
-                for ordered_keys, is_closed in paths:
-                    if self.closed_loop == 'OPEN':
-                        is_closed = False
-                    elif self.closed_loop == 'CLOSED':
-                        is_closed = True
-                    else:
-                        deg_vals = [len(sub.get(k, set())) for k in ordered_keys]
-                        is_closed = (len(ordered_keys) >= 3 and all(d == 2 for d in deg_vals))
-
-                    if len(set(ordered_keys)) <= 2:
-                        skipped += 1
-                        continue
-
-                    pts = read_uvs(ordered_keys)
-                    if pts is None:
-                        continue
-
-                    # simple equalize: redistribute along polyline preserving ends for open
-                    if is_closed:
-                        dedup, idx_map = utils.dedup_with_map(pts, closed=True, eps=1e-9)
-                        if len(dedup) < 3:
-                            skipped += 1
-                            continue
-                        new_pts = utils.redistribute_evenly(dedup, preserve_ends=False, closed=True)
-                        if len(new_pts) != len(dedup):
-                            new_pts = new_pts[:len(dedup)]
-                    else:
-                        dedup, idx_map = utils.dedup_with_map(pts, closed=False, eps=1e-9)
-                        if len(dedup) < 2:
-                            skipped += 1
-                            continue
-                        new_pts = utils.redistribute_evenly(dedup, preserve_ends=True, closed=False)
-
-                    new_uvs = [new_pts[idx_map[i]] for i in range(len(ordered_keys))]
-                    moved_vis_keys = set()
-                    applied = set()
-                    for i, k in enumerate(ordered_keys):
-                        for loop in uv_to_loops.get(k, []):
-                            for l2 in utils.gather_welded_uv_loops(loop, uv_layer, uv_key_weld):
-                                if l2 not in applied:
-                                    l2[uv_layer].uv = new_uvs[i]
-                                    applied.add(l2)
-                                    moved_vis_keys.add(k)
-
-                    moved_vis_total += len(moved_vis_keys)
-                    processed += 1
-                    total_paths += 1
-                    if is_closed:
-                        count_closed += 1
-                    else:
-                        count_open += 1
+                pts = read_uvs(ordered_keys)
+                coords.extend(pts)
+                offsets.append(len(coords))
+                batch_keys.append(ordered_keys)
+                batch_closed.append(is_closed)
+                batch_iters.append(max_iter if (is_closed or not repeat_closed_only) else 1)
+
+            # 弧長均等化 + 弦長補正の反復（元の曲線上で取り直し、収束したパスから打ち切る）
+            # F9 で回数だけ変えた場合は前回の反復状態から続きを計算する
+            solver_params = ('equalize', graph_tol, self.closed_loop, conv_eps)
+            solver = cache.solver_state(me, snap, solver_params)
+            if solver is None:
+                solver = utils.equalize_solver(coords, offsets, batch_closed, conv_eps)
+                cache.store_solver_state(me, snap, solver_params, solver)
+            new_coords, ok, iters = utils.equalize_ragged(coords, offsets, batch_closed, batch_iters, conv_eps, solver=solver)
+
+            for pi, ordered_keys in enumerate(batch_keys):
+                if not ok[pi]:
+                    skipped += 1
+                    continue
+                base = offsets[pi]
+                is_closed = batch_closed[pi]
+                moved_vis_keys = set()
+                applied = set()
+                for i, k in enumerate(ordered_keys):
+                    for slot in uv_graph.slots(k):
+                        gid = welds.group_of(snap.loops[slot])
+                        if gid not in applied:
+                            welds.scatter(gid, new_coords[base + i])
+                            applied.add(gid)
+                            moved_vis_keys.add(k)
+
+                moved_vis_total += len(moved_vis_keys)
+                processed += 1
+                total_paths += 1
+                total_iters += iters[pi]
+                if is_closed:
+                    count_closed += 1
+                else:
+                    count_open += 1
 
             try:
+                cache.mark_uv_update(me)
                 bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
             except Exception:
                 pass
@@ -201,9 +182,11 @@ class UV_OT_loop_equalize(bpy.types.Operator):
                 self.report({'ERROR'}, 'No valid edge loops found.')
             return {'CANCELLED'}
 
-        msg = pgett("Equalize: Open {count_open} / Closed {count_closed} Moved {moved_vis_total}").format(
+        msg = pgett("Edge loops: Open {count_open} / Closed {count_closed} Total iters {total_iters} (avg {avg_iter:.2f}) Moved verts {moved_vis_total}").format(
             count_open=count_open,
             count_closed=count_closed,
+            total_iters=total_iters,
+            avg_iter=total_iters / max(total_paths, 1),
             moved_vis_total=moved_vis_total
         )
         if skipped > 0:
@@ -218,7 +201,7 @@ class UV_OT_loop_equalize_straight_open(bpy.types.Operator):
     bl_description = "Redistribute open loops evenly along endpoint line"
     bl_options = {'UNDO'}
 
-    weld_tolerance = bpy.props.FloatProperty(
+    weld_tolerance: bpy.props.FloatProperty(
         name="Weld tolerance",
         description="Precision for treating UVs as identical",
         min=1e-8, max=1e-2, default=1e-6, subtype='FACTOR'
@@ -259,6 +242,8 @@ class UV_OT_loop_equalize_straight_open(bpy.types.Operator):
 
         for obj in objs:
             me = obj.data
+            if not snapshot.mesh_has_selection(me):
+                continue
             try:
                 bm = bmesh.from_edit_mesh(me)
             except Exception:
@@ -267,100 +252,58 @@ class UV_OT_loop_equalize_straight_open(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv.verify()
 
             graph_tol = min(weld_tolerance * 0.25, 5e-7)
-            def uv_key_graph(v):
-                s = int(round(1.0 / max(graph_tol, 1e-12)))
-                return (int(round(v.x * s)), int(round(v.y * s)))
-            def uv_key_weld(v):
-                s = int(round(1.0 / max(weld_tolerance, 1e-12)))
-                return (int(round(v.x * s)), int(round(v.y * s)))
-
-            graph = {}
-            uv_to_loops = {}
-            found = False
-            for f in bm.faces:
-                if f.hide: continue
-                for l in f.loops:
-                    luv = l[uv_layer]
-                    ln = l.link_loop_next
-                    luvn = ln[uv_layer]
-
-                    if utils.uv_edge_selected(l, uv_layer):
-                        p = Vector(luv.uv)
-                        q = Vector(luvn.uv)
-                        a = uv_key_graph(p)
-                        b = uv_key_graph(q)
-                        uv_to_loops.setdefault(a, []).append(l)
-                        uv_to_loops.setdefault(b, []).append(ln)
-                        graph.setdefault(a, set()).add(b)
-                        graph.setdefault(b, set()).add(a)
-                        found = True
-            if not found:
-                continue
 
-            comps = utils.connected_components_keys(graph)
-            if not comps:
-                skipped += 1
+            snap = snapshot.take_snapshot(bm, uv_layer)
+            uv_graph, topo = cache.selection_topology(me, snap, graph_tol)
+            if not uv_graph.num_edges:
                 continue
+            welds = weld.build_weld_index(snap, uv_layer, uv_graph.all_slots(), weld_tolerance)
 
+            snap_uv = snap.uv_list()
             def read_uvs(keys):
-                pts = []
-                for k in keys:
-                    L = uv_to_loops.get(k, [])
-                    if not L: return None
-                    pts.append(Vector(L[0][uv_layer].uv))
-                return pts
-
-            for comp in comps:
-                sub = {k: set(nei for nei in graph.get(k, set()) if nei in comp) for k in comp}
-                paths = utils.extract_paths_from_component(sub)
-                if not paths:
+                return [tuple(snap_uv[uv_graph.node_slot[k]]) for k in keys]
+
+            batch_keys = []
+            coords = []
+            offsets = [0]
+            for ordered_keys, _is_cycle, _comp in topo.extract_paths():
+                if topo.is_simple_cycle(ordered_keys):
+                    count_closed += 1
+                    skipped += 1
+                    continue
+                if len(set(ordered_keys)) <= 2:
                     skipped += 1
                     continue
 
-                for ordered_keys, is_closed in paths:
-                    deg_vals = [len(sub.get(k, set())) for k in ordered_keys]
-                    is_closed = (len(ordered_keys) >= 3 and all(d == 2 for d in deg_vals))
-                    if is_closed:
-                        count_closed += 1
-                        skipped += 1
-                        continue
-                    if len(set(ordered_keys)) <= 2:
-                        skipped += 1
-                        continue
-
-                    pts = read_uvs(ordered_keys)
-                    if pts is None:
-                        continue
-
-                    dedup, idx_map = utils.dedup_with_map(pts, closed=False, eps=1e-9)
-                    if len(dedup) < 2:
-                        skipped += 1
-                        continue
-
-                    n = len(dedup)
-                    a = dedup[0]; b = dedup[-1]
-                    if n <= 2:
-                        new_pts = dedup[:]
-                    else:
-                        step = 1.0 / (n - 1)
-                        new_pts = [a.lerp(b, i * step) for i in range(n)]
-
-                    new_uvs = [new_pts[idx_map[i]] for i in range(len(ordered_keys))]
-                    moved_vis_keys = set()
-                    applied = set()
-                    for i, k in enumerate(ordered_keys):
-                        for loop in uv_to_loops.get(k, []):
-                            for l2 in utils.gather_welded_uv_loops(loop, uv_layer, uv_key_weld):
-                                if l2 not in applied:
-                                    l2[uv_layer].uv = new_uvs[i]
-                                    applied.add(l2)
-                                    moved_vis_keys.add(k)
-
-                    moved_vis_total += len(moved_vis_keys)
-                    processed += 1
-                    count_open += 1
+                pts = read_uvs(ordered_keys)
+                coords.extend(pts)
+                offsets.append(len(coords))
+                batch_keys.append(ordered_keys)
+
+            # 端点を結ぶ直線上に等間隔配置（全開パスを一括処理）
+            new_coords, ok = utils.redistribute_ragged(coords, offsets, [False] * len(batch_keys), straight=True)
+
+            for pi, ordered_keys in enumerate(batch_keys):
+                if not ok[pi]:
+                    skipped += 1
+                    continue
+                base = offsets[pi]
+                moved_vis_keys = set()
+                applied = set()
+                for i, k in enumerate(ordered_keys):
+                    for slot in uv_graph.slots(k):
+                        gid = welds.group_of(snap.loops[slot])
+                        if gid not in applied:
+                            welds.scatter(gid, new_coords[base + i])
+                            applied.add(gid)
+                            moved_vis_keys.add(k)
+
+                moved_vis_total += len(moved_vis_keys)
+                processed += 1
+                count_open += 1
 
             try:
+                cache.mark_uv_update(me)
                 bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
             except Exception:
                 pass
@@ -5,7 +5,7 @@ import bmesh
 # mathutils の Vector / Color 等
 from mathutils import Vector
 from bpy.app.translations import pgettext as pgett
-from .. import utils
+from .. import utils, snapshot, topology, weld, cache
 
 class UV_OT_loop_match3d_ratio(bpy.types.Operator):
     bl_idname = "uv.loop_match3d_ratio"
@@ -68,6 +68,8 @@ class UV_OT_loop_match3d_ratio(bpy.types.Operator):
 
         for obj in objs:
             me = obj.data
+            if not snapshot.mesh_has_selection(me):
+                continue
             try:
                 bm = bmesh.from_edit_mesh(me)
             except Exception:
@@ -76,198 +78,82 @@ class UV_OT_loop_match3d_ratio(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv.verify()
 
             graph_tol = min(weld_tolerance*0.25, 5e-7)
-            def uv_key_graph(v):
-                s = int(round(1.0/max(graph_tol,1e-12)))
-                return (int(round(v.x*s)), int(round(v.y*s)))
             def uv_key_weld(v):
-                s = int(round(1.0/max(weld_tolerance,1e-12)))
-                return (int(round(v.x*s)), int(round(v.y*s)))
-
-            graph = {}
-            uv_to_loops = {}
-            def add_map(pt, loop):
-                k = uv_key_graph(pt)
-                uv_to_loops.setdefault(k, []).append(loop)
-
-            found = False
-            for f in bm.faces:
-                if f.hide: continue
-                for l in f.loops:
-                    luv = l[uv_layer]
-                    ln = l.link_loop_next
-                    luvn = ln[uv_layer]
-
-                    if utils.uv_edge_selected(l, uv_layer):
-                        p = Vector(luv.uv)
-                        q = Vector(luvn.uv)
-                        add_map(p, l)
-                        add_map(q, ln)
-                        a = uv_key_graph(p)
-                        b = uv_key_graph(q)
-                        graph.setdefault(a, set()).add(b)
-                        graph.setdefault(b, set()).add(a)
-                        found = True
-            if not found:
-                continue
+                return topology.uv_key(v, weld_tolerance)
 
-            comps = utils.connected_components_keys(graph)
-            if not comps:
-                self.report({'ERROR'}, "Internal error: no connected components found.")
-                return {'CANCELLED'}
+            snap = snapshot.take_snapshot(bm, uv_layer)
+            uv_graph, topo = cache.selection_topology(me, snap, graph_tol)
+            if not uv_graph.num_edges:
+                continue
+            welds = weld.build_weld_index(snap, uv_layer, uv_graph.all_slots(), weld_tolerance)
 
+            snap_uv = snap.uv_list()
             def read_uvs(keys):
                 pts=[]
                 for k in keys:
-                    L = uv_to_loops.get(k,[])
-                    if not L: return None
-                    pts.append(Vector(L[0][uv_layer].uv))
+                    pts.append(Vector(snap_uv[uv_graph.node_slot[k]]))
                 return pts
+            geo = cache.geometry_buffers(me, bm)
+            node_vert = [snap.vert[s] for s in uv_graph.node_slot]
             def read_v3(keys):
-                pts=[]
-                for k in keys:
-                    L = uv_to_loops.get(k,[])
-                    if not L: return None
-                    pts.append(Vector(L[0].vert.co))
-                return pts
+                return geo.points([node_vert[k] for k in keys])
             def need_unwrap(points, is_closed):
                 if not is_closed or len(points)<3: return False
                 for i in range(len(points)):
                     a=points[i]; b=points[(i+1)%len(points)]
                     if abs(b.x-a.x)>0.5 or abs(b.y-a.y)>0.5: return True
                 return False
-            def resample_poly(points, fractions, closed=False):
-                if not points: return []
-                n=len(points)
-                if (closed and n<3) or ((not closed) and n<2): return points[:]
-                seg=[]; total=0.0
-                if closed:
-                    for i in range(n):
-                        d=(points[(i+1)%n]-points[i]).length
-                        seg.append(d); total+=d
-                else:
-                    for i in range(n-1):
-                        d=(points[i+1]-points[i]).length
-                        seg.append(d); total+=d
-                if total<=1e-20: return points[:]
-                def sample_at(dist):
-                    if closed:
-                        tt=dist%total; acc=0.0
-                        for i in range(n):
-                            L=seg[i]
-                            if acc+L>=tt-1e-15:
-                                tloc=0.0 if L<=1e-20 else (tt-acc)/L
-                                return points[i].lerp(points[(i+1)%n], tloc)
-                            acc+=L
-                        return points[-1]
-                    else:
-                        tt=min(dist,total-1e-12); acc=0.0
-                        for i in range(n-1):
-                            L=seg[i]
-                            if acc+L>=tt-1e-15:
-                                tloc=0.0 if L<=1e-20 else (tt-acc)/L
-                                return points[i].lerp(points[i+1], tloc)
-                            acc+=L
-                        return points[-1]
-                out=[]
-                for f in fractions:
-                    fclamp=(f%1.0) if closed else max(0.0, min(1.0,f))
-                    out.append(sample_at(fclamp*total))
-                return out
-
-            for comp in comps:
-                sub = {k:set(nei for nei in graph.get(k,set()) if nei in comp) for k in comp}
-                paths = utils.extract_paths_from_component(sub)
-                if not paths:
+            for ordered_keys, path_is_closed, _comp in topo.extract_paths():
+                # ignore trivial
+                if len(set(ordered_keys))<=2:
                     skipped+=1
                     continue
 
-                for ordered_keys, path_is_closed in paths:
-                    # ignore trivial
-                    if len(set(ordered_keys))<=2:
-                        skipped+=1
-                        continue
-
-                    # ユーザ指定が優先。AUTOなら path_is_closed を尊重。
-                    if self.closed_loop == 'OPEN':
-                        is_closed = False
-                    elif self.closed_loop == 'CLOSED':
-                        is_closed = True
-                    else:
-                        is_closed = bool(path_is_closed)
-
-                    # 保険：degrees による判定が必要ならここで確認（extract が怪しい場合）
-                    deg = [len(sub.get(k, set())) for k in ordered_keys]
-                    if len(ordered_keys) >= 3 and all(d == 2 for d in deg):
-                        is_closed = True
-
-                    pts_uv = read_uvs(ordered_keys)
-                    pts3   = read_v3(ordered_keys)
-                    if pts_uv is None or pts3 is None:
-                        self.report({'ERROR'}, "Internal error: failed to read corresponding UVs/vertices.")
-                        return {'CANCELLED'}
-
-                    uw = need_unwrap(pts_uv, is_closed)
-                    proc = utils.unwrap_cycle01(pts_uv) if (is_closed and uw) else pts_uv
-                    dedup, idx_map = utils.dedup_with_map(proc, closed=is_closed, eps=1e-9)
-                    m=len(dedup)
-                    if (is_closed and m<3) or ((not is_closed) and m<2):
-                        skipped+=1
-                        continue
-
-                    pts3_aligned=[]; seen=set()
-                    for j in range(m):
-                        pick=None
-                        for i,jm in enumerate(idx_map):
-                            if jm==j and i not in seen:
-                                pick=i; seen.add(i); break
-                        if pick is None: pick=0
-                        pts3_aligned.append(pts3[pick].copy())
-
-                    seg3=[]; total3=0.0; n3=len(pts3_aligned)
-                    if is_closed:
-                        for i in range(n3):
-                            d=(pts3_aligned[(i+1)%n3]-pts3_aligned[i]).length
-                            seg3.append(d); total3+=d
-                    else:
-                        for i in range(n3-1):
-                            d=(pts3_aligned[i+1]-pts3_aligned[i]).length
-                            seg3.append(d); total3+=d
-                    if total3<=1e-20:
-                        skipped+=1
-                        continue
-
-                    fracs=[0.0]; acc=0.0
-                    if is_closed:
-                        for i in range(n3-1): acc+=seg3[i]; fracs.append(acc/total3)
-                    else:
-                        for i in range(n3-2): acc+=seg3[i]; fracs.append(acc/total3)
-                        fracs.append(1.0)
-
-                    new_pts = resample_poly(dedup, fracs, closed=is_closed)
-                    if is_closed and uw:
-                        new_pts = utils.wrap01(new_pts)
-
-                    new_uvs = [new_pts[idx_map[i]] for i in range(len(ordered_keys))]
-                    moved_vis=set()
-                    for i,k in enumerate(ordered_keys):
-                        if uv_key_weld(proc[i]) != uv_key_weld(new_uvs[i]):
-                            moved_vis.add(uv_key_weld(proc[i]))
-                    applied=set()
-                    for i,k in enumerate(ordered_keys):
-                        nv = new_uvs[i]
-                        for loop in uv_to_loops.get(k,[]):
-                            for l2 in utils.gather_welded_uv_loops(loop, uv_layer, uv_key_weld):
-                                if l2 not in applied:
-                                    l2[uv_layer].uv = nv
-                                    applied.add(l2)
-                    if is_closed:
-                        count_closed+=1
-                    else:
-                        count_open+=1
-                    moved_vis_total+=len(moved_vis)
-                    processed+=1
+                # ユーザ指定が優先。AUTOなら path_is_closed を尊重。
+                if self.closed_loop == 'OPEN':
+                    is_closed = False
+                elif self.closed_loop == 'CLOSED':
+                    is_closed = True
+                else:
+                    is_closed = bool(path_is_closed)
+
+                # 保険：degrees による判定が必要ならここで確認（extract が怪しい場合）
+                if topo.is_simple_cycle(ordered_keys):
+                    is_closed = True
+
+                pts_uv = read_uvs(ordered_keys)
+                pts3   = read_v3(ordered_keys)
+
+                uw = need_unwrap(pts_uv, is_closed)
+                proc = utils.unwrap_cycle01(pts_uv) if (is_closed and uw) else pts_uv
+                new_uvs = utils.match_ratio(proc, pts3, closed=is_closed)
+                if new_uvs is None:
+                    skipped+=1
+                    continue
+                if is_closed and uw:
+                    new_uvs = utils.wrap01(new_uvs)
+
+                moved_vis=set()
+                for i,k in enumerate(ordered_keys):
+                    if uv_key_weld(proc[i]) != uv_key_weld(new_uvs[i]):
+                        moved_vis.add(uv_key_weld(proc[i]))
+                applied=set()
+                for i,k in enumerate(ordered_keys):
+                    nv = new_uvs[i]
+                    for slot in uv_graph.slots(k):
+                        gid = welds.group_of(snap.loops[slot])
+                        if gid not in applied:
+                            welds.scatter(gid, nv)
+                            applied.add(gid)
+                if is_closed:
+                    count_closed+=1
+                else:
+                    count_open+=1
+                moved_vis_total+=len(moved_vis)
+                processed+=1
 
             try:
+                cache.mark_uv_update(me)
                 bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
             except Exception:
                 pass
@@ -342,6 +228,8 @@ class UV_OT_loop_match3d_ratio_straight_open(bpy.types.Operator):
 
         for obj in objs:
             me = obj.data
+            if not snapshot.mesh_has_selection(me):
+                continue
             try:
                 bm = bmesh.from_edit_mesh(me)
             except Exception:
@@ -350,143 +238,79 @@ class UV_OT_loop_match3d_ratio_straight_open(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv.verify()
 
             graph_tol = min(weld_tolerance*0.25, 5e-7)
-            def uv_key_graph(v):
-                s = int(round(1.0/max(graph_tol,1e-12)))
-                return (int(round(v.x*s)), int(round(v.y*s)))
             def uv_key_weld(v):
-                s = int(round(1.0/max(weld_tolerance,1e-12)))
-                return (int(round(v.x*s)), int(round(v.y*s)))
-
-            graph={}; uv_to_loops={}
-            def add_map(pt, loop):
-                k = uv_key_graph(pt)
-                uv_to_loops.setdefault(k, []).append(loop)
-
-            found=False
-            for f in bm.faces:
-                if f.hide: continue
-                for l in f.loops:
-                    luv = l[uv_layer]
-                    ln = l.link_loop_next
-                    luvn = ln[uv_layer]
-
-                    if utils.uv_edge_selected(l, uv_layer):
-                        p = Vector(luv.uv)
-                        q = Vector(luvn.uv)
-                        add_map(p, l)
-                        add_map(q, ln)
-                        a = uv_key_graph(p)
-                        b = uv_key_graph(q)
-                        graph.setdefault(a, set()).add(b)
-                        graph.setdefault(b, set()).add(a)
-                        found = True
-            if not found:
-                continue
+                return topology.uv_key(v, weld_tolerance)
 
-            comps = utils.connected_components_keys(graph)
-            if not comps:
-                self.report({'ERROR'}, "内部エラー：連結成分が見つかりません。")
-                return {'CANCELLED'}
+            snap = snapshot.take_snapshot(bm, uv_layer)
+            uv_graph, topo = cache.selection_topology(me, snap, graph_tol)
+            if not uv_graph.num_edges:
+                continue
+            welds = weld.build_weld_index(snap, uv_layer, uv_graph.all_slots(), weld_tolerance)
 
+            snap_uv = snap.uv_list()
             def read_uvs(keys):
                 pts=[]
                 for k in keys:
-                    L=uv_to_loops.get(k,[])
-                    if not L: return None
-                    pts.append(Vector(L[0][uv_layer].uv))
+                    pts.append(Vector(snap_uv[uv_graph.node_slot[k]]))
                 return pts
+            geo = cache.geometry_buffers(me, bm)
+            node_vert = [snap.vert[s] for s in uv_graph.node_slot]
             def read_v3(keys):
-                pts=[]
-                for k in keys:
-                    L=uv_to_loops.get(k,[])
-                    if not L: return None
-                    pts.append(Vector(L[0].vert.co))
-                return pts
+                return geo.points([node_vert[k] for k in keys])
 
-            for comp in comps:
-                sub = {k:set(nei for nei in graph.get(k,set()) if nei in comp) for k in comp}
-                paths = utils.extract_paths_from_component(sub)
-                if not paths:
+            for ordered_keys, path_is_closed, _comp in topo.extract_paths():
+                # use returned path_is_closed as primary判定
+                is_closed = bool(path_is_closed)
+
+                # trivial path guard
+                if len(set(ordered_keys)) <= 2:
                     skipped += 1
                     continue
 
-                for ordered_keys, path_is_closed in paths:
-                    # use returned path_is_closed as primary判定
-                    is_closed = bool(path_is_closed)
+                # --- Additional safety checks to *force skip* closed loops ---
+                # 1) degree-based check (all deg==2 and length>=3 -> closed)
+                if topo.is_simple_cycle(ordered_keys):
+                    is_closed = True
+
+                # 2) coordinate-based check: first/last UV nearly equal -> closed
+                uv_coords = read_uvs(ordered_keys)
+                coord_tol = max(weld_tolerance * 10.0, 1e-6)
+                if len(uv_coords) >= 3 and (uv_coords[0] - uv_coords[-1]).length <= coord_tol:
+                    is_closed = True
+
+                # If determined closed by any check, skip (this operator targets open loops only)
+                if is_closed:
+                    count_closed += 1
+                    skipped += 1
+                    continue
+                # --- end safety checks ---
+
+                # proceed with open-loop straightening (unchanged logic below)
+                pts_uv = uv_coords
+                pts3   = read_v3(ordered_keys)
+
+                new_uvs = utils.match_ratio(pts_uv, pts3, closed=False, straight=True)
+                if new_uvs is None:
+                    skipped+=1
+                    continue
 
-                    # trivial path guard
-                    if len(set(ordered_keys)) <= 2:
-                        skipped += 1
-                        continue
-
-                    # --- Additional safety checks to *force skip* closed loops ---
-                    # 1) degree-based check (all deg==2 and length>=3 -> closed)
-                    deg_vals = [len(sub.get(k, set())) for k in ordered_keys]
-                    if len(ordered_keys) >= 3 and all(d == 2 for d in deg_vals):
-                        is_closed = True
-
-                    # 2) coordinate-based check: first/last UV nearly equal -> closed
-                    uv_coords = read_uvs(ordered_keys)
-                    if uv_coords is None:
-                        skipped += 1
-                        continue
-                    coord_tol = max(weld_tolerance * 10.0, 1e-6)
-                    if len(uv_coords) >= 3 and (uv_coords[0] - uv_coords[-1]).length <= coord_tol:
-                        is_closed = True
-
-                    # If determined closed by any check, skip (this operator targets open loops only)
-                    if is_closed:
-                        count_closed += 1
-                        skipped += 1
-                        continue
-                    # --- end safety checks ---
-
-                    # proceed with open-loop straightening (unchanged logic below)
-                    pts_uv = uv_coords
-                    pts3   = read_v3(ordered_keys)
-                    if pts3 is None:
-                        self.report({'ERROR'}, "内部エラー：対応UV/頂点が読み取れませんでした。")
-                        return {'CANCELLED'}
-
-                    # dedup + guard
-                    dedup, idx_map = utils.dedup_with_map(pts_uv, closed=False, eps=1e-9)
-                    m=len(dedup)
-                    if m<2:
-                        skipped+=1
-                        continue
-
-                    pts3_aligned=[pts3[next((i for i,jm in enumerate(idx_map) if jm==j),0)].copy() for j in range(m)]
-                    seg3=[]; total3=0.0
-                    for i in range(m-1):
-                        d=(pts3_aligned[i+1]-pts3_aligned[i]).length
-                        seg3.append(d); total3+=d
-                    if total3<=1e-20:
-                        skipped+=1
-                        continue
-                    fracs=[0.0]; acc=0.0
-                    for i in range(m-2): acc+=seg3[i]; fracs.append(acc/total3)
-                    fracs.append(1.0)
-
-                    a=dedup[0]; b=dedup[-1]
-                    new_pts=[a.lerp(b, f) for f in fracs]
-
-                    new_uvs=[new_pts[idx_map[i]] for i in range(len(ordered_keys))]
-                    moved_vis=set()
-                    for i,k in enumerate(ordered_keys):
-                        if uv_key_weld(pts_uv[i]) != uv_key_weld(new_uvs[i]):
-                            moved_vis.add(uv_key_weld(pts_uv[i]))
-                    applied=set()
-                    for i,k in enumerate(ordered_keys):
-                        nv = new_uvs[i]
-                        for loop in uv_to_loops.get(k,[]):
-                            for l2 in utils.gather_welded_uv_loops(loop, uv_layer, uv_key_weld):
-                                if l2 not in applied:
-                                    l2[uv_layer].uv = nv
-                                    applied.add(l2)
-                    moved_vis_total+=len(moved_vis); processed+=1; count_open+=1
+                moved_vis=set()
+                for i,k in enumerate(ordered_keys):
+                    if uv_key_weld(pts_uv[i]) != uv_key_weld(new_uvs[i]):
+                        moved_vis.add(uv_key_weld(pts_uv[i]))
+                applied=set()
+                for i,k in enumerate(ordered_keys):
+                    nv = new_uvs[i]
+                    for slot in uv_graph.slots(k):
+                        gid = welds.group_of(snap.loops[slot])
+                        if gid not in applied:
+                            welds.scatter(gid, nv)
+                            applied.add(gid)
+                moved_vis_total+=len(moved_vis); processed+=1; count_open+=1
 
             # update mesh per-object
             try:
+                cache.mark_uv_update(me)
                 bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
             except Exception:
                 pass
@@ -2,6 +2,7 @@
 import bpy
 import bmesh
 import math
+import bisect
 import blf
 from bpy.app.translations import pgettext_iface as iface_
 from bpy.app.translations import pgettext as pgett
@@ -22,7 +23,146 @@ except Exception:
     def batch_for_shader(shader, type, attrs):
         return _DummyBatch()
 
-from .. import utils
+from .. import utils, snapshot, weld, cache, spatial
+
+class ArcTable:
+    """
+    サンプル済みカーブの弧長表。
+    samples  : 折れ線の点列
+    seg_pairs: 区間の端点インデックス（閉ループは末尾→先頭を含む）
+    seg_lens : 区間長
+    cum      : 累積弧長（cum[0] = 0, cum[i+1] = cum[i] + seg_lens[i]）
+    total    : 全長（0 なら 1.0）
+    """
+    __slots__ = ("samples", "seg_pairs", "seg_lens", "cum", "total", "closed")
+
+    def __init__(self, samples, closed):
+        self.samples = samples
+        self.closed = bool(closed)
+        n = len(samples)
+        seg_pairs = [(i, i + 1) for i in range(n - 1)]
+        if closed and n >= 2:
+            seg_pairs.append((n - 1, 0))
+        seg_lens = [(samples[b] - samples[a]).length for a, b in seg_pairs]
+        cum = [0.0]
+        for L in seg_lens:
+            cum.append(cum[-1] + L)
+        self.seg_pairs = seg_pairs
+        self.seg_lens = seg_lens
+        self.cum = cum
+        self.total = cum[-1] if cum[-1] > 0.0 else 1.0
+
+    def locate(self, frac):
+        """
+        弧長比 frac の位置を (i0, i1, t) で返す（サンプル i0 → i1 を t で補間）。
+        累積弧長を二分探索し、target 以上になる最初の区間を使う。
+        """
+        f = (frac % 1.0) if self.closed else max(0.0, min(1.0, frac))
+        target = f * self.total
+        cum = self.cum
+        si = bisect.bisect_left(cum, target, 1) - 1
+        if si >= len(self.seg_lens):
+            i1 = self.seg_pairs[-1][1]
+            return i1, i1, 0.0
+        i0, i1 = self.seg_pairs[si]
+        L = self.seg_lens[si]
+        t = 0.0 if L == 0.0 else (target - cum[si]) / L
+        return i0, i1, t
+
+    def point_at_fraction(self, frac):
+        i0, i1, t = self.locate(frac)
+        if i0 == i1:
+            return self.samples[i1]
+        return self.samples[i0].lerp(self.samples[i1], t)
+
+
+class LoopTable:
+    """
+    1 オブジェクト分の書き込み対象ループ表（invoke で 1 回だけ作る）。
+    loops  : カーブに割り当てたループと、それに溶接されたループ
+    keys   : 各ループの (面インデックス, 頂点インデックス)（BMesh を取り直したときの引き直し用）
+    orig   : 各ループの元の UV（キャンセル時の復元用）
+    groups : 溶接グループごとの loops の番号列
+    プレビューはグループ単位の代入だけで済み、ループの検索や溶接判定を繰り返さない。
+    BMesh・UV レイヤーの参照もセッション中保持し、編集メッシュが差し替えられたときだけ取り直す。
+    """
+    __slots__ = ("mesh", "bm", "uv_layer", "loops", "keys", "orig", "groups", "_welds", "_group_ids")
+
+    def __init__(self, mesh, bm, uv_layer, weld_tol):
+        self.mesh = mesh
+        self.bm = bm
+        self.uv_layer = uv_layer
+        self.loops = []
+        self.keys = []
+        self.orig = []
+        self.groups = []
+        self._welds = weld.WeldIndex(uv_layer, weld_tol)
+        self._group_ids = {}
+
+    def add(self, loop):
+        """loop を（溶接グループごと）登録し、(loops 上の番号, グループ番号) を返す"""
+        wid = self._welds.group_of(loop)
+        gid = self._group_ids.get(wid)
+        if gid is None:
+            gid = len(self.groups)
+            self._group_ids[wid] = gid
+            members = []
+            for l2 in self._welds.groups[wid]:
+                members.append(len(self.loops))
+                self.loops.append(l2)
+                self.keys.append((l2.face.index, l2.vert.index))
+                self.orig.append(l2[self.uv_layer].uv.copy())
+            self.groups.append(members)
+        for j in self.groups[gid]:
+            if self.loops[j] == loop:
+                return j, gid
+        return self.groups[gid][0], gid
+
+    def is_stale(self, mesh):
+        """保持している BMesh が解放・差し替えられていれば True（BMesh を取り直さずに判定）"""
+        try:
+            return mesh != self.mesh or not mesh.is_editmode or not self.bm.is_valid
+        except Exception:
+            return True
+
+    def rebind(self, mesh, bm, uv_layer):
+        """BMesh が作り直されていたら keys からループを引き直す"""
+        self.mesh = mesh
+        self.uv_layer = uv_layer
+        if bm is self.bm:
+            return
+        self.bm = bm
+        bm.faces.ensure_lookup_table()
+        bm.verts.index_update()
+        loops = []
+        for fi, vi in self.keys:
+            hit = None
+            for l in bm.faces[fi].loops:
+                if l.vert.index == vi:
+                    hit = l
+                    break
+            loops.append(hit)
+        self.loops = loops
+
+    def write(self, j, uv):
+        self.loops[j][self.uv_layer].uv = uv
+
+    def scatter(self, gid, uv):
+        """溶接グループ gid の全ループへ uv を代入"""
+        loops = self.loops
+        uv_layer = self.uv_layer
+        for j in self.groups[gid]:
+            loops[j][uv_layer].uv = uv
+
+    def restore(self):
+        """全ループを元の UV へ戻す"""
+        uv_layer = self.uv_layer
+        for l, uv in zip(self.loops, self.orig):
+            try:
+                l[uv_layer].uv = uv
+            except Exception:
+                pass
+
 
 class CurveData:
     def __init__(self, orig_path, closed_locked):
@@ -31,11 +171,27 @@ class CurveData:
         self.ctrl = []
         self.orig_fractions = []
         self.loops = []      # list of (obj, face_index, loop_index)
+        self.entries = []    # 各ループの LoopTable.loops 上の番号
+        self.welds = []      # 各ループの LoopTable の溶接グループ番号
+        self.keys = []       # パスのノード番号列（トポロジーでのループ割り当て用）
+        self.verts = set()   # 割り当てられたループの頂点インデックス
         self.orig_uvs = []
         self.active_idx = -1
         self.sel = set()
         self.obj = None
         self.uv_layer = None
+        self.version = 0            # 制御点を変更するたびに touch() で進める
+        self.applied_version = -1   # プレビューで UV へ書き込んだ時点の version
+        self.applied_tol = None     # そのときのサンプリング許容誤差
+        self._arc = None            # (version, tolerance, ArcTable)
+    def touch(self):
+        self.version += 1
+    def arc_table(self, resolution, curve_type, tolerance=None):
+        """現在の制御点の ArcTable（version・許容誤差が変わるまで再利用）。サンプルが 2 点未満なら None"""
+        if self._arc is None or self._arc[0] != self.version or self._arc[1] != tolerance:
+            samples, _ = utils.sample_polyline(self.ctrl, resolution=resolution, curve_type=curve_type, closed=self.closed_locked, tolerance=tolerance)
+            self._arc = (self.version, tolerance, ArcTable(samples, self.closed_locked) if len(samples) >= 2 else None)
+        return self._arc[2]
 
 class MultiSplineState:
     def __init__(self):
@@ -90,6 +246,14 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         mu, mv = self.v2d.region_to_view(x, y)
         return Vector((mu, mv))
 
+    def _curve_tolerance(self, coarse=False):
+        """カーブのサンプリング許容誤差（UV 単位）。coarse=True はドラッグ中の粗い値"""
+        name, default = ('drag_curve_tolerance', 1e-3) if coarse else ('curve_tolerance', 1e-4)
+        try:
+            return float(getattr(self._get_prefs(), name, default))
+        except Exception:
+            return default
+
     def _pref_int(self, prefs, name, default):
         """Safely get an integer preference value; fallback to default if value is deferred or invalid."""
         try:
@@ -107,6 +271,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         if hasattr(self, '_ctrl_backup') and self._ctrl_backup is not None:
             for c, back in zip(self.ms.curves, self._ctrl_backup):
                 c.ctrl[:] = [v.copy() for v in back]
+                c.touch()
             self._apply_preview_all(context)
 
     def _clamp_global(self, n):
@@ -138,100 +303,215 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         for c in self.ms.curves:
             c.ctrl[:] = utils.resample_by_length(c.orig_path, count, closed=c.closed_locked)
             c.sel = {i for i in c.sel if i < count}
+            c.touch()
         self.ms.global_points = count
 
     def _resample_all_from_current(self, count):
         for c in self.ms.curves:
-            samples, _ = utils.sample_polyline(c.ctrl, resolution=self._resolution_fixed, curve_type=self._curve_type_fixed, closed=c.closed_locked)
-            if len(samples) >= 2:
-                c.ctrl[:] = utils.resample_by_length(samples, count, closed=c.closed_locked)
+            arc = c.arc_table(self._resolution_fixed, self._curve_type_fixed, self._curve_tolerance())
+            if arc is not None:
+                c.ctrl[:] = utils.resample_by_length(arc.samples, count, closed=c.closed_locked)
                 c.sel = {i for i in c.sel if i < count}
+                c.touch()
         self.ms.global_points = count
 
-    def _apply_preview_all(self, context):
-        bm_cache = {}
-        # normalize weld_tolerance to native float to avoid _PropertyDeferred in closures
-        try:
-            weld_tol = float(getattr(self, 'weld_tolerance', 1e-6))
-        except Exception:
-            weld_tol = 1e-6
-        for c in self.ms.curves:
-            obj = getattr(c, 'obj', context.object)
-            if obj not in bm_cache:
-                try:
-                    bm = bmesh.from_edit_mesh(obj.data)
-                    uv_layer = bm.loops.layers.uv.verify()
-                    bm_cache[obj] = (bm, uv_layer)
-                except Exception:
-                    bm_cache[obj] = (None, None)
-            bm, uv_layer = bm_cache[obj]
-            if bm is None or uv_layer is None:
+    @staticmethod
+    def _project_to_paths(points, path_samples, curves):
+        """
+        各点を最も近いパスへ投影し [(カーブ番号, 弧長比), ...] を返す（届かなければカーブ番号 None）。
+        全パスの区間を 1 つの空間索引にまとめ、全点を 1 回ずつ問い合わせる
+        （同距離ならパスの並び順で先のパスを選ぶ）。
+        """
+        if not points:
+            return []
+        paths = [ps for ps in path_samples if ps[1]]
+        index = spatial.PolylineIndex.from_paths([(samples, curves[ci].closed_locked) for ci, samples, _l, _c, _t in paths])
+        out = []
+        for hit in index.query_paths(points):
+            if hit is None:
+                out.append((None, 0.0))
                 continue
-            if len(c.ctrl) < 2:
-                for (o, fidx, lidx), uv0 in zip(c.loops, c.orig_uvs):
-                    try:
-                        loop = bm.faces[fidx].loops[lidx]
-                        loop[uv_layer].uv = uv0
-                    except Exception:
-                        pass
+            k, idx, _q, tloc = hit
+            ci, samples, seg_lens, cum, total = paths[k]
+            frac = 0.0
+            if seg_lens:
+                seg_len = seg_lens[idx] if idx < len(seg_lens) else 0.0
+                dist = cum[idx] + (tloc * seg_len if seg_len > 0.0 else 0.0)
+                frac = (dist / total) if total > 0.0 else 0.0
+                if curves[ci].closed_locked:
+                    frac = frac % 1.0
+                else:
+                    frac = max(0.0, min(1.0, frac))
+            out.append((ci, frac))
+        return out
+
+    def _shared_vertex_followers(self):
+        """各カーブについて、頂点を共有する後続カーブの番号集合"""
+        owners = {}
+        for ci, c in enumerate(self.ms.curves):
+            obj = getattr(c, 'obj', None)
+            for vi in c.verts:
+                owners.setdefault((obj, vi), []).append(ci)
+        followers = [set() for _ in self.ms.curves]
+        for cis in owners.values():
+            for i, ci in enumerate(cis):
+                followers[ci].update(cis[i + 1:])
+        return followers
+
+    def _dirty_curves(self, force=False, tol=None):
+        """
+        書き直すカーブ番号の集合。version が進んだカーブ・tol より粗い許容誤差で書いたカーブに加え、
+        頂点を共有する後続カーブも含める
+        （溶接ループの最終値はカーブ順で後に書いたものになるため、従来と同じ順で書き直す）。
+        """
+        curves = self.ms.curves
+        dirty = {ci for ci, c in enumerate(curves)
+                 if force or c.version != c.applied_version
+                 or c.applied_tol is None or (tol is not None and c.applied_tol > tol)}
+        followers = getattr(self, '_curve_followers', None)
+        if dirty and followers is not None and len(followers) == len(curves):
+            for ci in range(len(curves)):
+                if ci in dirty:
+                    dirty.update(followers[ci])
+        return dirty
+
+    def _apply_preview_all(self, context, force=False, coarse=False):
+        """
+        変更のあったカーブのループ UV を書き直す。
+        coarse=True（ドラッグ中）は粗い許容誤差でサンプルし、以降の通常呼び出しで細かく書き直される。
+        """
+        tol = self._curve_tolerance(coarse)
+        dirty = self._dirty_curves(force, tol)
+        tables = {}
+        for ci, c in enumerate(self.ms.curves):
+            if ci not in dirty:
                 continue
-            samples, _ = utils.sample_polyline(c.ctrl, resolution=self._resolution_fixed, curve_type=self._curve_type_fixed, closed=c.closed_locked)
-            if len(samples) < 2:
-                for (o, fidx, lidx), uv0 in zip(c.loops, c.orig_uvs):
+            c.applied_version = c.version
+            c.applied_tol = tol
+            obj = getattr(c, 'obj', context.object)
+            if obj not in tables:
+                tables[obj] = self._loop_table(obj)
+            table = tables[obj]
+            if table is None:
+                continue
+            arc = c.arc_table(self._resolution_fixed, self._curve_type_fixed, tol) if len(c.ctrl) >= 2 else None
+            if arc is None:
+                for j, uv0 in zip(c.entries, c.orig_uvs):
                     try:
-                        loop = bm.faces[fidx].loops[lidx]
-                        loop[uv_layer].uv = uv0
+                        table.write(j, uv0)
                     except Exception:
                         pass
+                if c.entries:
+                    self._pending_updates.add(obj)
                 continue
-            seg_pairs = []; seg_lens = []
-            n = len(samples)
-            for i in range(n - 1):
-                seg_pairs.append((i, i+1))
-                seg_lens.append((samples[i+1] - samples[i]).length)
-            if c.closed_locked:
-                seg_pairs.append((n-1, 0))
-                seg_lens.append((samples[0] - samples[-1]).length)
-            cum=[0.0]
-            for L in seg_lens:
-                cum.append(cum[-1]+L)
-            total = cum[-1] if cum[-1] > 0.0 else 1.0
-            def point_at_fraction(frac: float):
-                f = (frac % 1.0) if c.closed_locked else max(0.0, min(1.0, frac))
-                target = f * total
-                acc = 0.0
-                for si, L in enumerate(seg_lens):
-                    if acc + L >= target:
-                        i0, i1 = seg_pairs[si]
-                        t = 0.0 if L == 0.0 else (target - acc) / L
-                        return samples[i0].lerp(samples[i1], t)
-                    acc += L
-                i0, i1 = seg_pairs[-1]
-                return samples[i1]
-            for (o, fidx, lidx), frac in zip(c.loops, c.orig_fractions):
+            for gid, frac in zip(c.welds, c.orig_fractions):
                 try:
-                    loop = bm.faces[fidx].loops[lidx]
-                    new_uv = point_at_fraction(frac)
-                    key_func = lambda v, _tol=weld_tol: utils._uv_key(v, tol=_tol)
-                    welded = utils.gather_welded_uv_loops(loop, uv_layer, key_func)
-                    if not hasattr(self, '_welded_backup') or self._welded_backup is None:
-                        self._welded_backup = {}
-                    for l2 in welded:
-                        k = (obj, l2.face.index, list(l2.face.loops).index(l2))
-                        if k not in self._welded_backup:
-                            try:
-                                self._welded_backup[k] = l2[uv_layer].uv.copy()
-                            except Exception:
-                                pass
-                        l2[uv_layer].uv = new_uv
+                    table.scatter(gid, arc.point_at_fraction(frac))
                 except Exception:
                     pass
-        for obj, (bm, uv_layer) in bm_cache.items():
-            if bm is None: continue
+            if c.entries:
+                self._pending_updates.add(obj)
+        if dirty and self.area:
+            self.area.tag_redraw()
+        self._flush_updates()
+
+    def _flush_updates(self):
+        """
+        UV を書き込んだオブジェクトだけに update_edit_mesh を送る。
+        ドラッグ中はタイマーの tick ごとに 1 回だけ呼ばれるので、送る頻度は tick の間隔
+        （_timer_interval、設定の drag_update_rate）で決まる。
+        """
+        if not self._pending_updates:
+            return
+        for obj in self._pending_updates:
             try:
+                cache.mark_uv_update(obj.data)
                 bmesh.update_edit_mesh(obj.data, loop_triangles=False, destructive=False)
             except Exception:
                 pass
+        self._pending_updates.clear()
+
+    def _loop_table(self, obj):
+        """
+        obj の LoopTable（無ければ None）。保持している BMesh が有効ならそのまま使い、
+        編集メッシュが差し替えられていた場合だけ from_edit_mesh / verify で取り直す。
+        """
+        table = self._loop_tables.get(obj)
+        if table is None:
+            return None
+        try:
+            me = obj.data
+            if table.is_stale(me):
+                bm = bmesh.from_edit_mesh(me)
+                table.rebind(me, bm, bm.loops.layers.uv.verify())
+        except Exception:
+            return None
+        return table
+
+    def _begin_fast_drag(self):
+        """
+        高速ドラッグ用の線形写像を作る。ドラッグ開始時点の弧長位置（サンプル区間と t）を固定すると、
+        各ループの UV は制御点の線形結合になる。動かす制御点の重みの和だけを
+        ループごとに保持し、移動中は 開始時の UV + 重み × 移動量 で更新する。
+        """
+        self._fast_drag = None
+        if not self._drag_data or not getattr(self._get_prefs(), 'fast_drag_preview', False):
+            return
+        moved = {}
+        for ci, i, _base in self._drag_data:
+            moved.setdefault(ci, set()).add(i)
+        tables = {}
+        for ci, idxs in moved.items():
+            c = self.ms.curves[ci]
+            if len(c.ctrl) < 2:
+                continue
+            tol = self._curve_tolerance()
+            arc = c.arc_table(self._resolution_fixed, self._curve_type_fixed, tol)
+            if arc is None:
+                continue
+            sw = utils.sample_polyline_weights(c.ctrl, resolution=self._resolution_fixed, curve_type=self._curve_type_fixed, closed=c.closed_locked, tolerance=tol)
+            if len(sw) != len(arc.samples):
+                continue
+            rows = []
+            for k, frac in enumerate(c.orig_fractions):
+                i0, i1, t = arc.locate(frac)
+                w = {}
+                for si, f in ((i0, 1.0 - t), (i1, t)):
+                    if f != 0.0:
+                        for j, wj in sw[si].items():
+                            w[j] = w.get(j, 0.0) + f * wj
+                wm = sum(wj for j, wj in w.items() if j in idxs)
+                if wm == 0.0:
+                    continue
+                uv0 = Vector((0.0, 0.0))
+                for j, wj in w.items():
+                    uv0 += wj * c.ctrl[j]
+                rows.append((k, uv0, wm))
+            tables[ci] = rows
+        self._fast_drag = (self._drag_data, tables)
+
+    def _apply_fast_drag(self, context, delta):
+        """_begin_fast_drag の線形写像で、動かしたカーブのループだけを更新する"""
+        _data, rows_by_curve = self._fast_drag
+        tables = {}
+        for ci, rows in rows_by_curve.items():
+            c = self.ms.curves[ci]
+            obj = getattr(c, 'obj', context.object)
+            if obj not in tables:
+                tables[obj] = self._loop_table(obj)
+            table = tables[obj]
+            if table is None:
+                continue
+            for k, uv0, wm in rows:
+                try:
+                    table.scatter(c.welds[k], uv0 + wm * delta)
+                except Exception:
+                    pass
+            if rows:
+                self._pending_updates.add(obj)
+        if self.area:
+            self.area.tag_redraw()
+        self._flush_updates()
 
     @staticmethod
     def _get_prefs():
@@ -321,8 +601,11 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     pass
             for c in self.ms.curves:
                 if len(c.ctrl) < 2: continue
-                samples, _ = utils.sample_polyline(c.ctrl, resolution=self._resolution_fixed, curve_type=self._curve_type_fixed, closed=c.closed_locked)
-                if len(samples) < 2: continue
+                # 表示は最後にプレビューへ使ったサンプル（ドラッグ中は粗い方）をそのまま使う
+                tol = c.applied_tol if c.applied_tol is not None else self._curve_tolerance()
+                arc = c.arc_table(self._resolution_fixed, self._curve_type_fixed, tol)
+                if arc is None: continue
+                samples = arc.samples
                 pts_px = [uv_to_px(p) for p in samples]
                 coords = [(p.x, p.y) for p in pts_px]
                 if backend_is_gl and shader2d is not None:
@@ -470,60 +753,48 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         per_obj_loops = {}
         for obj in objs:
             me = obj.data
+            if not snapshot.mesh_has_selection(me):
+                continue
             bm = bmesh.from_edit_mesh(me)
             uv_layer = bm.loops.layers.uv.verify()
+            snap = snapshot.take_snapshot(bm, uv_layer)
+            snap_uv = snap.uv_list()
+            snap_next = snap.next_list()
             loops = []
             orig_uvs = []
             seen = set()
-            found_edge = False
-            for f in bm.faces:
-                if getattr(f, 'hide', False):
-                    continue
-                for l in f.loops:
-                    luv = l[uv_layer]
-                    ln = l.link_loop_next
-                    luvn = ln[uv_layer]
-
-                    if utils.uv_edge_selected(l, uv_layer):
-                        li = (l.face.index, list(l.face.loops).index(l))
-                        if li not in seen:
-                            loops.append(l)
-                            orig_uvs.append(luv.uv.copy())
-                            seen.add(li)
-
-                        lni = (ln.face.index, list(ln.face.loops).index(ln))
-                        if lni not in seen:
-                            loops.append(ln)
-                            orig_uvs.append(luvn.uv.copy())
-                            seen.add(lni)
-
-                        found_edge = True
-            if not found_edge:
+            for sl in snap.selected_slots():
+                for t in (sl, snap_next[sl]):
+                    if t not in seen:
+                        loops.append(t)
+                        orig_uvs.append(Vector(snap_uv[t]))
+                        seen.add(t)
+            if not loops:
                 continue
             if len(loops) <= 2:
                 continue
-            paths = utils.build_all_selected_uv_paths(bm, uv_layer)
-            def _uv_key_graph(v, tol=5e-7):
-                s = int(round(1.0 / max(tol, 1e-12)))
-                return (int(round(v.x * s)), int(round(v.y * s)))
+            paths = utils.build_all_selected_uv_paths(bm, uv_layer, snap=snap, me=me, with_keys=True)
+            # 各ループのグラフノード（パスと同じグラフ・同じ量子化）
+            uv_graph, _topo = cache.selection_topology(me, snap, 5e-7)
+            slot_node = uv_graph.slot_nodes()
             valid_keys = set()
-            for _pts, _closed in paths:
-                for _p in _pts:
-                    valid_keys.add(_uv_key_graph(_p))
+            for _pts, _closed, _keys in paths:
+                valid_keys.update(_keys)
             if valid_keys:
                 _loops_f = []
                 _uvs_f = []
                 for _l, _uv0 in zip(loops, orig_uvs):
-                    if _uv_key_graph(_uv0) in valid_keys:
+                    if slot_node.get(_l) in valid_keys:
                         _loops_f.append(_l); _uvs_f.append(_uv0)
                 loops, orig_uvs = _loops_f, _uvs_f
-            per_obj_loops[obj] = (loops, orig_uvs, bm, uv_layer)
+            per_obj_loops[obj] = (loops, orig_uvs, snap, slot_node, bm, uv_layer)
 
-            for pts, closed in paths:
+            for pts, closed, keys in paths:
                 if len(pts) <= 2:
                     continue
                 cd = CurveData(pts, closed)
                 cd.obj = obj; cd.uv_layer = uv_layer
+                cd.keys = list(keys)
                 temp_curves.append(cd)
                 if closed: any_closed = True
                 
@@ -544,9 +815,19 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         for c in temp_curves:
             c.ctrl = utils.resample_by_length(c.orig_path, self.ms.global_points, closed=c.closed_locked)
 
-        for obj, (loops, orig_uvs, bm, uv_layer) in per_obj_loops.items():
+        try:
+            weld_tol = float(getattr(self, 'weld_tolerance', 1e-6))
+        except Exception:
+            weld_tol = 1e-6
+        self._loop_tables = {}
+        for obj, (loops, orig_uvs, snap, slot_node, bm, uv_layer) in per_obj_loops.items():
+            # 書き込むループと溶接グループはここで 1 回だけ求める（UV はまだ元の値）
+            table = LoopTable(obj.data, bm, uv_layer, weld_tol)
+            self._loop_tables[obj] = table
             obj_curve_indices = [i for i, cd in enumerate(temp_curves) if getattr(cd, 'obj', None) == obj]
             path_samples = []
+            # ノード → (カーブ, パス上の位置)。ノードが複数のカーブに現れる場合は最初のカーブ
+            node_pos = {}
             for ci in obj_curve_indices:
                 cd = temp_curves[ci]
                 samples = cd.orig_path[:]
@@ -562,35 +843,41 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     cum.append(cum[-1] + L)
                 total = cum[-1] if cum else 1.0
                 path_samples.append((ci, samples, seg_lens, cum, total))
+                for j, k in enumerate(cd.keys):
+                    if k not in node_pos:
+                        node_pos[k] = (ci, cum[j], total)
+
+            # トポロジーで決まらないループだけ最近傍のカーブへ投影する
+            fallback = [uv0 for l, uv0 in zip(loops, orig_uvs) if node_pos.get(slot_node.get(l)) is None]
+            projected = iter(self._project_to_paths(fallback, path_samples, temp_curves))
 
             for l, uv0 in zip(loops, orig_uvs):
-                p = Vector((uv0.x, uv0.y))
-                best_ci = None; best_d2 = 1e20; best_frac = 0.0
-                for (ci, samples, seg_lens, cum, total) in path_samples:
-                    if len(samples) < 2:
-                        d2 = (p - samples[0]).length_squared if samples else 1e20
-                        q = samples[0] if samples else p
-                        frac = 0.0
+                pos = node_pos.get(slot_node.get(l))
+                if pos is not None:
+                    # トポロジーで位置が決まる：パス上の累積弧長比をそのまま使う
+                    ci, dist, total = pos
+                    frac = (dist / total) if total > 0.0 else 0.0
+                    if temp_curves[ci].closed_locked:
+                        frac = frac % 1.0
                     else:
-                        idx, q, tloc = utils.closest_point_on_polyline(samples, p, closed=temp_curves[ci].closed_locked)
-                        if seg_lens:
-                            seg_len = seg_lens[idx] if idx < len(seg_lens) else 0.0
-                            dist = cum[idx] + (tloc * seg_len if seg_len > 0.0 else 0.0)
-                            frac = (dist / total) if total > 0.0 else 0.0
-                            if temp_curves[ci].closed_locked:
-                                frac = frac % 1.0
-                            else:
-                                frac = max(0.0, min(1.0, frac))
-                        else:
-                            frac = 0.0
-                        d2 = (p - q).length_squared
-                    if d2 < best_d2:
-                        best_d2 = d2; best_ci = ci; best_frac = frac
+                        frac = max(0.0, min(1.0, frac))
+                    cd = temp_curves[ci]
+                    face_idx, loop_idx = snap.face_corner(l)
+                    cd.loops.append((obj, face_idx, loop_idx))
+                    j, gid = table.add(snap.loops[l])
+                    cd.entries.append(j); cd.welds.append(gid)
+                    cd.verts.add(int(snap.vert[l]))
+                    cd.orig_uvs.append(uv0.copy())
+                    cd.orig_fractions.append(frac)
+                    continue
+                best_ci, best_frac = next(projected)
                 if best_ci is not None:
                     cd = temp_curves[best_ci]
-                    face_idx = l.face.index
-                    loop_idx = list(l.face.loops).index(l)
+                    face_idx, loop_idx = snap.face_corner(l)
                     cd.loops.append((obj, face_idx, loop_idx))
+                    j, gid = table.add(snap.loops[l])
+                    cd.entries.append(j); cd.welds.append(gid)
+                    cd.verts.add(int(snap.vert[l]))
                     cd.orig_uvs.append(uv0.copy())
                     cd.orig_fractions.append(best_frac)
 
@@ -601,9 +888,11 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
 
         self.ms.global_points = max(self.ms.all_closed_min(), self.ms.global_points)
         self._resample_all_from_original(self.ms.global_points)
+        self._curve_followers = self._shared_vertex_followers()
 
         self._is_drag_mode = False
         self._drag_data = None
+        self._drag_pending = None  # ドラッグ中の最新カーソル位置（タイマーで評価する）
         self._axis_constraint = None
         self._display_spline = True
         self._display_points = True
@@ -613,6 +902,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         self._box_start = (0,0); self._box_end = (0,0); self._box_add = False
         self._maybe_box_start = None; self._maybe_box_threshold_sq = 9
         self._axis_constraint = None  # 'X' or 'Y' または None
+        self._pending_updates = set()  # UV を書き込んで update_edit_mesh がまだのオブジェクト
 
         sizes = [len(c.loops) for c in self.ms.curves]
         self.ms.active_curve = sizes.index(max(sizes)) if sizes else 0
@@ -622,51 +912,18 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         self._shader = gpu.shader.from_builtin('UNIFORM_COLOR')
         self._point_shader = gpu.shader.from_builtin('POINT_UNIFORM_COLOR')
         self._handle = bpy.types.SpaceImageEditor.draw_handler_add(self.draw_callback, (context,), 'WINDOW', 'POST_PIXEL')
-        self._timer = context.window_manager.event_timer_add(0.03, window=context.window)
+        # 再描画はイベント駆動。タイマーはドラッグの評価待ちがある間だけ動かす（_start_timer）
+        self._timer = None
         context.window_manager.modal_handler_add(self)
         return {'RUNNING_MODAL'}
 
     def finish(self, context, cancel=False):
         if cancel:
-            wb = getattr(self, '_welded_backup', None)
-            if wb:
-                obj_cache = {}
-                for (obj, fidx, lidx), uv in wb.items():
-                    try:
-                        if obj not in obj_cache:
-                            bm = bmesh.from_edit_mesh(obj.data)
-                            uv_layer = bm.loops.layers.uv.verify()
-                            obj_cache[obj] = (bm, uv_layer)
-                        bm, uv_layer = obj_cache[obj]
-                        loop = bm.faces[fidx].loops[lidx]
-                        loop[uv_layer].uv = uv
-                    except Exception:
-                        pass
-                for obj, (bm, _) in obj_cache.items():
-                    try:
-                        bmesh.update_edit_mesh(obj.data, loop_triangles=False, destructive=False)
-                    except Exception:
-                        pass
-                self._welded_backup = {}
-            bm_cache = {}
-            for c in self.ms.curves:
-                obj = getattr(c, 'obj', context.object)
-                if obj not in bm_cache:
-                    try:
-                        bm = bmesh.from_edit_mesh(obj.data)
-                        uv_layer = bm.loops.layers.uv.verify()
-                        bm_cache[obj] = (bm, uv_layer)
-                    except Exception:
-                        bm_cache[obj] = (None, None)
-                bm, uv_layer = bm_cache[obj]
-                if bm is None or uv_layer is None:
-                    continue
-                for (o, fidx, lidx), uv0 in zip(c.loops, c.orig_uvs):
-                    try:
-                        loop = bm.faces[fidx].loops[lidx]
-                        loop[uv_layer].uv = uv0
-                    except Exception:
-                        pass
+            # カーブのループと溶接されたループを invoke 時の UV へ戻す
+            for obj in getattr(self, '_loop_tables', {}):
+                table = self._loop_table(obj)
+                if table is not None:
+                    table.restore()
 
         if not cancel:
             counts = [len(c.ctrl) for c in self.ms.curves]
@@ -687,15 +944,16 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         if self._handle:
             bpy.types.SpaceImageEditor.draw_handler_remove(self._handle, 'WINDOW')
             self._handle = None
-        if self._timer:
-            context.window_manager.event_timer_remove(self._timer)
-            self._timer = None
+        self._stop_timer(context)
 
+        # 間引きで保留中の通知も含め、最後に必ず全オブジェクトへ送る
         objs = {getattr(c, 'obj', context.object) for c in self.ms.curves}
         if not objs:
             objs = {context.object}
+        self._pending_updates = set()
         for obj in objs:
             try:
+                cache.mark_uv_update(obj.data)
                 bmesh.update_edit_mesh(obj.data, loop_triangles=False, destructive=False)
             except Exception:
                 pass
@@ -755,11 +1013,37 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         if not self._drag_data:
             self._drag_start_uv = None
             return False
+        self._begin_fast_drag()
+        self._drag_pending = None
         self._is_drag_mode = True
         return True
 
-    def _apply_drag(self, event):
-        cur_uv = self._region_to_uv(event.mouse_region_x, event.mouse_region_y)
+    def _timer_interval(self):
+        """ドラッグを評価する tick の間隔（秒）。drag_update_rate 回/秒、0 は制限なし（約 100 回/秒）"""
+        rate = self._pref_int(self._get_prefs(), 'drag_update_rate', 30)
+        return 1.0 / rate if rate > 0 else 0.01
+
+    def _start_timer(self, context):
+        """ドラッグの評価待ちがある間だけタイマーを動かす（待ちが無ければ次の tick で止まる）"""
+        if self._timer is None:
+            self._timer = context.window_manager.event_timer_add(self._timer_interval(), window=context.window)
+
+    def _stop_timer(self, context):
+        if self._timer is not None:
+            context.window_manager.event_timer_remove(self._timer)
+            self._timer = None
+
+    def _flush_drag(self):
+        """記録しておいた最新のカーソル位置でドラッグを 1 回だけ評価する（評価したら True）"""
+        pending = self._drag_pending
+        self._drag_pending = None
+        if pending is None or not self._is_drag_mode or not self._drag_data:
+            return False
+        self._apply_drag(*pending)
+        return True
+
+    def _apply_drag(self, mx, my):
+        cur_uv = self._region_to_uv(mx, my)
         delta = cur_uv - self._drag_start_uv
 
         # --- 軸制限 ---
@@ -773,7 +1057,13 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                 c = self.ms.curves[ci]
                 if 0 <= i < len(c.ctrl):
                     c.ctrl[i] = base + delta
-            self._apply_preview_all(self._context_for_restore)
+                    c.touch()
+            fast = getattr(self, '_fast_drag', None)
+            if fast is not None and fast[0] is self._drag_data:
+                # 高速ドラッグ：線形写像で更新し、弧長の厳密な再評価はリリース時に行う
+                self._apply_fast_drag(self._context_for_restore, delta)
+            else:
+                self._apply_preview_all(self._context_for_restore, coarse=True)
 
     # modal loop
     def modal(self, context, event):
@@ -805,6 +1095,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         if event.type in {'RET','NUMPAD_ENTER'} and event.value == 'PRESS':
             if self._is_drag_mode or getattr(self,'_drag_data',None):
                 try:
+                    self._flush_drag()
                     self._apply_preview_all(context)
                 except Exception:
                     self._restore_ctrl(context)
@@ -894,6 +1185,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
         if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
             if getattr(self, '_is_drag_mode', False):
                 try:
+                    self._flush_drag()
                     self._apply_preview_all(context)
                 except Exception:
                     self._restore_ctrl(context)
@@ -914,6 +1206,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     except Exception:
                         pass
                     c = self.ms.curves[cidx]
+                    c.touch()
                     c.sel = {i if i < pidx else i-1 for i in c.sel if i != pidx and (i-1) >= 0}
                     # --- Active index maintenance after DELETE (Ctrl+LMB) ---
                     if c.active_idx == pidx:
@@ -935,9 +1228,10 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     for ci, c in enumerate(self.ms.curves):
                         if len(c.ctrl) < 2:
                             continue
-                        samples, _ = utils.sample_polyline(c.ctrl, resolution=self._resolution_fixed, curve_type=self._curve_type_fixed, closed=c.closed_locked)
-                        if len(samples) < 2:
+                        arc = c.arc_table(self._resolution_fixed, self._curve_type_fixed, self._curve_tolerance())
+                        if arc is None:
                             continue
+                        samples = arc.samples
                         seg_count = (len(samples) - 1) + (1 if c.closed_locked else 0)
                         for s in range(seg_count):
                             i0 = s
@@ -966,6 +1260,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     ac = best_c
                     ac = max(0, min(ac, len(self.ms.curves)-1))
                     c = self.ms.curves[ac]
+                    c.touch()
                     n = len(c.ctrl)
                     if n < 2:
                         c.ctrl.append(self.mouse_uv)
@@ -1029,6 +1324,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                 else:
                     self._clear_selection()
                     self._maybe_box_start = (event.mouse_region_x, event.mouse_region_y)
+                if self.area: self.area.tag_redraw()
                 return {'RUNNING_MODAL'}
 
         elif event.type == 'MOUSEMOVE':
@@ -1043,7 +1339,9 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     if self.area: self.area.tag_redraw()
                     return {'RUNNING_MODAL'}
             if self._is_drag_mode:
-                self._apply_drag(event)
+                # 位置だけ記録し、評価は次のタイマー tick でまとめて 1 回行う
+                self._drag_pending = (event.mouse_region_x, event.mouse_region_y)
+                self._start_timer(context)
                 return {'RUNNING_MODAL'}
             return {'RUNNING_MODAL'}
 
@@ -1052,6 +1350,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                 self._maybe_box_start = None
                 return {'RUNNING_MODAL'}
             if self._is_drag_mode:
+                self._flush_drag()
                 self._is_drag_mode = False
                 self._drag_data = None
                 self._axis_constraint = None
@@ -1098,31 +1397,22 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
             return {'RUNNING_MODAL'}
 
         elif event.type == 'R' and event.value == 'PRESS':
-            bm_cache = {}
+            tables = {}
             for c in self.ms.curves:
                 obj = getattr(c, 'obj', context.object)
-                if obj not in bm_cache:
-                    try:
-                        bm = bmesh.from_edit_mesh(obj.data)
-                        uv_layer = bm.loops.layers.uv.verify()
-                        bm_cache[obj] = (bm, uv_layer)
-                    except Exception:
-                        bm_cache[obj] = (None, None)
-                bm, uv_layer = bm_cache[obj]
-                if bm is None or uv_layer is None:
+                if obj not in tables:
+                    tables[obj] = self._loop_table(obj)
+                table = tables[obj]
+                if table is None:
                     continue
-                for (o, fidx, lidx), uv in zip(c.loops, c.orig_uvs):
+                for j, uv in zip(c.entries, c.orig_uvs):
                     try:
-                        loop = bm.faces[fidx].loops[lidx]
-                        loop[uv_layer].uv = uv
+                        table.write(j, uv)
                     except Exception:
                         pass
-            for obj, (bm, uv_layer) in bm_cache.items():
-                if bm is None: continue
-                try:
-                    bmesh.update_edit_mesh(obj.data, loop_triangles=False, destructive=False)
-                except Exception:
-                    pass
+                if c.entries:
+                    self._pending_updates.add(obj)
+            # 通知は続くプレビューでまとめて送る
             self._resample_all_from_original(self.ms.global_points)
             self._apply_preview_all(context)
             return {'RUNNING_MODAL'}
@@ -1136,6 +1426,7 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                     for i in sorted(c.sel, reverse=True):
                         if 0 <= i < len(c.ctrl):
                             c.ctrl.pop(i)
+                    c.touch()
                     # 削除後、選択状態をクリア
                     c.sel.clear()
                 except Exception:
@@ -1157,8 +1448,10 @@ class UV_OT_spline_adjust_modal(bpy.types.Operator):
                 self.report({'INFO'}, f"Axis constrained to {axis}")
             return {'RUNNING_MODAL'}
 
-        if event.type in {'MOUSEMOVE','TIMER'}:
-            if self.area: self.area.tag_redraw()
+        if event.type == 'TIMER':
+            # 評価したときはプレビュー側で再描画・更新される。待ちが無ければタイマーを止めて待機中は起こさない
+            if not self._flush_drag():
+                self._stop_timer(context)
             return {'RUNNING_MODAL'}
 
         return {'RUNNING_MODAL'}
@@ -31,6 +31,26 @@ class UVSplineAdjusterPreferences(bpy.types.AddonPreferences):
     point_pick_threshold_px: bpy.props.IntProperty(
         name="Point Pick Threshold (px)", default=12, min=1, max=64
     )
+    curve_tolerance: bpy.props.FloatProperty(
+        name="Curve Tolerance",
+        description="Maximum distance (UV units) between the spline and its sampled polyline",
+        default=1e-4, min=1e-7, max=1e-1, precision=6
+    )
+    drag_curve_tolerance: bpy.props.FloatProperty(
+        name="Drag Curve Tolerance",
+        description="Coarser sampling tolerance used while dragging; the curve is resampled with Curve Tolerance on release",
+        default=1e-3, min=1e-7, max=1e-1, precision=6
+    )
+    drag_update_rate: bpy.props.IntProperty(
+        name="Drag Update Rate",
+        description="Drag evaluations and mesh update notifications per second while dragging (0 = no limit). A final update is always sent on release",
+        default=30, min=0, max=240
+    )
+    fast_drag_preview: bpy.props.BoolProperty(
+        name="Fast Drag Preview",
+        description="While dragging, move loops with a linear map of the control points fixed at drag start; exact arc-length placement is applied on release",
+        default=False
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -39,6 +59,7 @@ class UVSplineAdjusterPreferences(bpy.types.AddonPreferences):
         box.prop(self, 'curve_color', text='Curve Color')
         box.prop(self, 'curve_thickness', text='Curve Thickness')
         box.prop(self, 'insert_pick_threshold_px', text='Insert Pick Threshold (px)')
+        box.prop(self, 'curve_tolerance', text='Curve Tolerance')
         box = layout.box()
         box.label(text='Control Points')
         row = box.row(align=True)
@@ -47,6 +68,11 @@ class UVSplineAdjusterPreferences(bpy.types.AddonPreferences):
         row.prop(self, 'point_color_active', text='Active')
         box.prop(self, 'point_size', text='Control Point Size')
         box.prop(self, 'point_pick_threshold_px', text='Point Pick Threshold (px)')
+        box = layout.box()
+        box.label(text='Drag')
+        box.prop(self, 'drag_curve_tolerance', text='Drag Curve Tolerance')
+        box.prop(self, 'fast_drag_preview', text='Fast Drag Preview')
+        box.prop(self, 'drag_update_rate', text='Drag Update Rate')
 
 
 classes = (UVSplineAdjusterPreferences,)
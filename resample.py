@@ -0,0 +1,691 @@
+# resample.py
+"""
+NumPy ベースの弧長リサンプリングエンジン。
+utils の Vector 版 (redistribute_evenly / resample_by_length など) と同じ規則を
+(N, D) の float64 配列で一括計算する。bpy / mathutils には依存しない。
+NumPy が無い環境では HAS_NUMPY が False になり、呼び出し側は純 Python 版を使う。
+"""
+import math
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # Blender 同梱の Python 以外で NumPy が無い場合
+    np = None
+
+HAS_NUMPY = np is not None
+
+# これより短い点列は Python 版の方が速い（配列変換のオーバーヘッドが勝つ）
+NP_MIN_POINTS = 32
+
+# 均等化のパスは変動係数がこの幅（相対・絶対）を超えて小さくなったときだけ採用する
+# （改善しないパスの採否が丸め誤差で分かれ、NumPy 版と Python 版の結果が食い違うのを防ぐ）
+CV_IMPROVE_REL = 1e-9
+CV_IMPROVE_ABS = 1e-12
+
+
+def cv_improved(new_cv, cv):
+    """均等化のパスを採用するか（スカラーでも配列でもよい。Python 版と共通の判定）"""
+    return new_cv < cv * (1.0 - CV_IMPROVE_REL) - CV_IMPROVE_ABS
+
+
+def as_array(points):
+    """Vector / タプル列を (N, D) float64 配列に変換"""
+    if isinstance(points, np.ndarray):
+        return np.asarray(points, dtype=np.float64)
+    return np.array([tuple(p) for p in points], dtype=np.float64)
+
+
+def _step_lengths(P):
+    """隣接点間の距離 (N-1,)"""
+    d = np.diff(P, axis=0)
+    return np.sqrt((d * d).sum(axis=1))
+
+
+def _resolve_drops(P, keep, eps, starts=()):
+    """
+    隣接距離で仮決めした keep を、「直前に残した点」との逐次判定の結果に直す。
+    直前の点が残っている点は隣接距離の判定がそのまま正しいので、
+    隣接距離が eps 以下の点から次に残る点までの区間だけを順に辿る（全体で O(n)）。
+    starts : 必ず残す点（パスの先頭）。区間はここで打ち切る
+    """
+    drops = np.flatnonzero(~keep).tolist()
+    if not drops:
+        return keep
+    pts = P.tolist()
+    starts = set(starts)
+    n = len(pts)
+    resolved = 0
+    for j in drops:
+        if j < resolved:
+            continue
+        last = pts[j - 1]  # j - 1 は残っている
+        i = j
+        while i < n:
+            if i in starts:
+                keep[i] = True
+                break
+            p = pts[i]
+            if math.sqrt(sum((a - b) * (a - b) for a, b in zip(p, last))) > eps:
+                keep[i] = True
+                break
+            keep[i] = False
+            i += 1
+        resolved = i + 1
+    return keep
+
+
+def _keep_mask(P, eps):
+    """「直前に残した点」との距離が eps を超える点を True にするマスク（逐次判定と同じ結果）"""
+    n = len(P)
+    keep = np.ones(n, dtype=bool)
+    if n < 2:
+        return keep
+    keep[1:] = _step_lengths(P) > eps
+    return _resolve_drops(P, keep, eps)
+
+
+def dedup_with_map(P, closed=False, eps=1e-9):
+    """
+    utils.dedup_with_map の配列版。
+    return: (dedup (M, D), idx_map (N,) int64)
+    """
+    P = as_array(P)
+    if len(P) == 0:
+        return P.copy(), np.zeros(0, dtype=np.int64)
+    keep = _keep_mask(P, eps)
+    dedup = P[keep]
+    idx_map = np.cumsum(keep) - 1
+    if closed and len(dedup) >= 2:
+        d = dedup[0] - dedup[-1]
+        if np.sqrt((d * d).sum()) <= eps:
+            last_idx = len(dedup) - 1
+            dedup = dedup[:-1]
+            idx_map[idx_map == last_idx] = 0
+    return dedup, idx_map
+
+
+def unwrap_cycle01(P):
+    """utils.unwrap_cycle01 の配列版（0/1 境界を跨ぐ閉ループを連続空間へ）"""
+    P = as_array(P)
+    out = P[:, :2].copy()
+    if len(out) < 2:
+        return out
+    d = np.diff(out, axis=0)
+    step = (d < -0.5).astype(np.float64) - (d > 0.5).astype(np.float64)
+    out[1:] += np.cumsum(step, axis=0)
+    return out
+
+
+def wrap01(P):
+    """utils.wrap01 の配列版"""
+    P = as_array(P)[:, :2]
+    return P - np.round(P)
+
+
+def segment_lengths(P, closed=False):
+    """各区間長。閉ループでは末尾→先頭の区間を含む"""
+    if closed and len(P) >= 2:
+        d = np.roll(P, -1, axis=0) - P
+        return np.sqrt((d * d).sum(axis=1))
+    return _step_lengths(P)
+
+
+def sample_at_distances(P, seg, dist, closed=False):
+    """
+    区間長 seg を持つポリライン P 上で、始点からの距離 dist の位置を一括補間。
+    utils.redistribute_evenly 内 sample_at と同じ探索規則（1e-15 の許容）を使う。
+    """
+    n = len(P)
+    total = float(np.cumsum(seg)[-1]) if len(seg) else 0.0
+    cum_end = np.cumsum(seg)
+    if closed:
+        tt = np.mod(dist, total)
+        nxt = (np.arange(n) + 1) % n
+    else:
+        tt = np.minimum(dist, total - 1e-12)
+        nxt = np.arange(1, n)
+    i = np.searchsorted(cum_end, tt - 1e-15, side='left')
+    past_end = i >= len(seg)
+    i = np.minimum(i, len(seg) - 1)
+    L = seg[i]
+    acc = cum_end[i] - L
+    with np.errstate(divide='ignore', invalid='ignore'):
+        local = np.where(L <= 1e-20, 0.0, (tt - acc) / np.where(L <= 1e-20, 1.0, L))
+    a = P[i]
+    b = P[nxt[i]]
+    out = a * (1.0 - local)[:, None] + b * local[:, None]
+    if past_end.any():
+        out[past_end] = P[-1]
+    return out
+
+
+def redistribute_evenly(P, preserve_ends=True, closed=False, eps=1e-9):
+    """
+    utils.redistribute_evenly の配列版。
+    return: 再配置後の (M, D) 配列。処理できない場合は None（呼び出し側で元の点列を返す）
+    """
+    P = as_array(P)
+    if len(P) < 2:
+        return None
+    pts = P[_keep_mask(P, eps)]
+    if closed and len(pts) >= 2:
+        d = pts[0] - pts[-1]
+        if np.sqrt((d * d).sum()) <= eps:
+            pts = pts[:-1]
+    n = len(pts)
+    if (closed and n < 3) or (not closed and n < 2):
+        return None
+
+    seg = segment_lengths(pts, closed=closed)
+    total = float(np.cumsum(seg)[-1])
+    if total <= 1e-20:
+        return None
+
+    if closed:
+        step = total / n
+        return sample_at_distances(pts, seg, np.arange(n) * step, closed=True)
+    step = total / (n - 1)
+    out = sample_at_distances(pts, seg, np.arange(n) * step, closed=False)
+    if preserve_ends:
+        out[0] = pts[0]
+        out[-1] = pts[-1]
+    return out
+
+
+def first_occurrence(idx_map, m):
+    """idx_map の逆写像：各 dedup 点へ最初に写る入力インデックス（写る点が無ければ 0）"""
+    first = np.zeros(m, dtype=np.int64)
+    uniq, pos = np.unique(idx_map, return_index=True)
+    first[uniq] = pos
+    return first
+
+
+def length_fractions(P, closed=False):
+    """
+    各点までの累積区間長 / 全長。閉ループは [0, ..., <1)、開パスは [0, ..., 1] の n 点。
+    全長が 0 なら None。
+    """
+    cum = np.cumsum(segment_lengths(P, closed=closed))
+    total = float(cum[-1]) if len(cum) else 0.0
+    if total <= 1e-20:
+        return None
+    if closed:
+        return np.concatenate(([0.0], cum[:-1] / total))
+    return np.concatenate(([0.0], cum[:-1] / total, [1.0]))
+
+
+def match_ratio(uv, p3, closed=False, straight=False, eps=1e-9):
+    """
+    Match 3D ratio の 1 パス分。UV 点列を、対応する 3D 点列の区間長比の位置へ取り直す。
+    uv: (N, 2)（閉ループの 0/1 跨ぎの展開は呼び出し側）、p3: (N, 3) 同じ並びの頂点座標
+    straight=True なら始点→終点の直線上に比率どおり並べる（開パス用）
+    return: 入力と同じ並びの (N, 2)。点数不足・3D 長さ 0 なら None
+    """
+    uv = as_array(uv)
+    p3 = as_array(p3)
+    dedup, idx_map = dedup_with_map(uv, closed=closed, eps=eps)
+    m = len(dedup)
+    if (closed and m < 3) or (not closed and m < 2):
+        return None
+    fr = length_fractions(p3[first_occurrence(idx_map, m)], closed=closed)
+    if fr is None:
+        return None
+    if straight:
+        new = dedup[0] * (1.0 - fr)[:, None] + dedup[-1] * fr[:, None]
+    else:
+        seg = segment_lengths(dedup, closed=closed)
+        total = float(np.cumsum(seg)[-1])
+        if total <= 1e-20:
+            new = dedup
+        else:
+            f = np.mod(fr, 1.0) if closed else np.clip(fr, 0.0, 1.0)
+            new = sample_at_distances(dedup, seg, f * total, closed=closed)
+    return new[idx_map]
+
+
+def resample_by_length(P, count, closed=False):
+    """
+    utils.resample_by_length の配列版（閉ループの重複端点処理は呼び出し側で済ませておく）。
+    return: (count, D) 配列
+    """
+    P = as_array(P)
+    pts = np.vstack([P, P[:1]]) if closed else P
+    cum = np.concatenate(([0.0], np.cumsum(_step_lengths(pts))))
+    total = float(cum[-1])
+    if total == 0.0:
+        return np.repeat(P[:1], count, axis=0)
+    j = np.arange(count, dtype=np.float64)
+    t = j / float(count) if closed else j / float(max(1, count - 1))
+    target = t * total
+    i = np.searchsorted(cum[1:], target, side='left') + 1
+    i = np.minimum(i, len(cum) - 1)
+    seg_len = cum[i] - cum[i - 1]
+    zero = seg_len == 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(zero, 1.0, (target - cum[i - 1]) / np.where(zero, 1.0, seg_len))
+    a = pts[i - 1]
+    b = pts[i]
+    return a * (1.0 - s)[:, None] + b * s[:, None]
+
+
+@lru_cache(maxsize=16)
+def bezier_basis(steps):
+    """
+    区間あたり steps 個のサンプル（t = s / steps, s = 0..steps-1）の 3 次ベルンシュタイン重み (steps, 4)。
+    重みは utils.bezier_cubic と同じ式で計算する。読み取り専用で共有するので書き換えないこと。
+    """
+    rows = []
+    for s in range(steps):
+        t = s / float(steps)
+        it = 1.0 - t
+        rows.append((it**3, 3 * (it**2) * t, 3 * it * (t**2), t**3))
+    W = np.array(rows, dtype=np.float64)
+    W.setflags(write=False)
+    return W
+
+
+def sample_cardinal_bezier(P, resolution=128, closed=False, steps=None):
+    """
+    utils.sample_polyline（BEZIER）の配列版。制御点を通る 3 次ベジェ（ハンドル = 隣接点差 / 6）を
+    全区間まとめて評価する。閉ループの重複端点処理は呼び出し側で済ませておく。
+    steps: 区間ごとのサンプル数（省略時は resolution を区間数で均等割り）
+    return: (M, D) 配列（開パスは終点を含む）
+    """
+    P = as_array(P)
+    n = len(P)
+    seg_count = n if closed else (n - 1)
+    i0 = np.arange(seg_count)
+    if closed:
+        i1 = (i0 + 1) % n
+        im1 = (i0 - 1) % n
+        i2 = (i0 + 2) % n
+    else:
+        i1 = i0 + 1
+        im1 = np.maximum(0, i0 - 1)
+        i2 = np.minimum(n - 1, i0 + 2)
+    p0, p1, p2, p3 = P[im1], P[i0], P[i1], P[i2]
+    h1 = p1 + (p2 - p0) / 6.0
+    h2 = p2 - (p3 - p1) / 6.0
+    if steps is None or len(set(steps)) == 1:
+        W = bezier_basis(max(2, resolution // max(1, seg_count)) if steps is None else int(steps[0]))
+        # (区間, サンプル, 次元)。足し合わせの順は bezier_cubic と同じ
+        out = (W[None, :, 0, None] * p1[:, None, :] + W[None, :, 1, None] * h1[:, None, :]
+               + W[None, :, 2, None] * h2[:, None, :] + W[None, :, 3, None] * p2[:, None, :])
+        out = out.reshape(-1, P.shape[1])
+    else:
+        # 区間ごとに分割数が違う場合は、サンプル単位に基底と区間を並べて評価
+        W = np.concatenate([bezier_basis(int(k)) for k in steps])
+        seg = np.repeat(i0, np.asarray(steps, dtype=np.int64))
+        out = (W[:, 0, None] * p1[seg] + W[:, 1, None] * h1[seg]
+               + W[:, 2, None] * h2[seg] + W[:, 3, None] * p2[seg])
+    if not closed:
+        out = np.vstack([out, P[-1:]])
+    return out
+
+
+def arc_params(P):
+    """点列の累積弧長 / 全長 (N,)。全長 0 なら全て 0"""
+    cum = np.concatenate(([0.0], np.cumsum(_step_lengths(P))))
+    total = float(cum[-1])
+    if total == 0:
+        return np.zeros(len(P))
+    return cum / total
+
+
+# --- 複数パス一括処理（ラグド配列） -----------------------------------------
+# 全パスの座標を 1 本の (N, D) 配列に連結し、offsets (P+1,) で区切って扱う。
+# パス数ではなく総頂点数に比例するコストで処理する。
+
+def _ragged_ids(offsets):
+    """各要素が属するパス番号と、パス内での位置"""
+    counts = np.diff(offsets)
+    pid = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(int(offsets[-1])) - offsets[:-1][pid]
+    return pid, local
+
+
+def _ragged_keep_mask(P, offsets, eps):
+    """_keep_mask のパス単位版（各パスの先頭は必ず残す）"""
+    n = len(P)
+    keep = np.ones(n, dtype=bool)
+    if n < 2:
+        return keep
+    starts = offsets[:-1][np.diff(offsets) > 0]
+    keep[1:] = _step_lengths(P) > eps
+    keep[starts] = True
+    return _resolve_drops(P, keep, eps, starts.tolist())
+
+
+def ragged_dedup(P, offsets, closed, eps=1e-9):
+    """
+    dedup_with_map のパス単位一括版。
+    return: (dedup (M, D), dedup_offsets (P+1,), idx_map (N,) — dedup 配列への大域インデックス)
+    """
+    keep = _ragged_keep_mask(P, offsets, eps)
+    pid, _ = _ragged_ids(offsets)
+    idx_map = np.cumsum(keep) - 1
+    kept_pid = pid[keep]
+    num_paths = len(offsets) - 1
+    dcounts = np.bincount(kept_pid, minlength=num_paths)
+    doff = np.concatenate(([0], np.cumsum(dcounts)))
+
+    # 閉ループで先頭=末尾なら末尾を落とし、参照を先頭へ付け替える
+    has2 = closed & (dcounts >= 2)
+    first = doff[:-1]
+    last = doff[1:] - 1
+    D = P[keep]
+    drop = np.zeros(num_paths, dtype=bool)
+    if has2.any():
+        d = D[first[has2]] - D[last[has2]]
+        drop[has2] = np.sqrt((d * d).sum(axis=1)) <= eps
+    if drop.any():
+        remap = np.arange(len(D))
+        remap[last[drop]] = first[drop]
+        idx_map = remap[idx_map]
+        alive = np.ones(len(D), dtype=bool)
+        alive[last[drop]] = False
+        shift = np.cumsum(~alive)
+        idx_map = idx_map - shift[idx_map]
+        D = D[alive]
+        dcounts = dcounts - drop
+        doff = np.concatenate(([0], np.cumsum(dcounts)))
+    return D, doff, idx_map
+
+
+def ragged_segment_lengths(D, doff, closed):
+    """
+    各点から次点までの区間長（閉ループは末尾→先頭を含む）と次点インデックス。
+    開パスの末尾点は区間を持たないので長さ 0・次点は自身。
+    """
+    m = len(D)
+    counts = np.diff(doff)
+    pid, local = _ragged_ids(doff)
+    nxt = np.arange(m) + 1
+    is_last = local == (counts[pid] - 1)
+    wrap = is_last & closed[pid]
+    nxt[wrap] = doff[:-1][pid[wrap]]
+    tail = is_last & ~closed[pid]
+    nxt[tail] = np.arange(m)[tail]
+    d = D[nxt] - D
+    seg = np.sqrt((d * d).sum(axis=1))
+    seg[tail] = 0.0
+    return seg, nxt
+
+
+def _ragged_searchsorted(values, vpid, queries, qpid):
+    """
+    パスごとに昇順な values に対し、同じパス内で values >= query となる最初の位置
+    （パス内ローカル index, searchsorted side='left' 相当）を一括で求める。
+    """
+    nv = len(values)
+    keys_val = np.concatenate((values, queries))
+    keys_pid = np.concatenate((vpid, qpid))
+    # 同値では query を先に並べ、「query より小さい values の数」を数える
+    kind = np.concatenate((np.ones(nv, dtype=np.int8), np.zeros(len(queries), dtype=np.int8)))
+    order = np.lexsort((kind, keys_val, keys_pid))
+    is_val = kind[order] == 1
+    before = np.cumsum(is_val) - is_val
+    pos = np.empty(len(order), dtype=np.int64)
+    pos[order] = before
+    num_paths = int(max(vpid.max(initial=-1), qpid.max(initial=-1))) + 1
+    vstart = np.concatenate(([0], np.cumsum(np.bincount(vpid, minlength=num_paths))))
+    return pos[nv:] - vstart[qpid]
+
+
+def ragged_cumulative(seg, doff, closed):
+    """パス内累積長（各区間の終端までの距離）とパスごとの全長"""
+    counts = np.diff(doff)
+    pid, _ = _ragged_ids(doff)
+    cum_end_all = np.cumsum(seg)
+    base = np.concatenate(([0.0], cum_end_all))[doff[:-1]]
+    cum_end = cum_end_all - base[pid]
+    nseg = np.where(closed, counts, np.maximum(counts - 1, 0))
+    total = np.zeros(len(counts))
+    nz = nseg > 0
+    total[nz] = cum_end[doff[:-1][nz] + nseg[nz] - 1]
+    return cum_end, total
+
+
+def ragged_sample_at_distances(D, doff, seg, nxt, closed, dist, qpid, cum=None):
+    """
+    sample_at_distances のパス単位一括版。
+    dist: 各クエリのパス始点からの距離、qpid: クエリが属するパス
+    cum: ragged_cumulative の結果（再利用する場合）
+    """
+    counts = np.diff(doff)
+    pid, local = _ragged_ids(doff)
+    cum_end, total = cum if cum is not None else ragged_cumulative(seg, doff, closed)
+    nseg = np.where(closed, counts, np.maximum(counts - 1, 0))
+    # 開パスでは末尾点が区間を持たないので検索対象から外す
+    has_seg = local < nseg[pid]
+
+    qclosed = closed[qpid]
+    qtotal = total[qpid]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tt = np.where(qclosed, np.mod(dist, np.where(qclosed, qtotal, 1.0)), np.minimum(dist, qtotal - 1e-12))
+    sidx = np.flatnonzero(has_seg)
+    i = _ragged_searchsorted(cum_end[sidx], pid[sidx], tt - 1e-15, qpid)
+    qn = nseg[qpid]
+    past_end = i >= qn
+    i = np.minimum(i, qn - 1)
+    g = doff[:-1][qpid] + i
+    L = seg[g]
+    acc = cum_end[g] - L
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(L <= 1e-20, 0.0, (tt - acc) / np.where(L <= 1e-20, 1.0, L))
+    out = D[g] * (1.0 - t)[:, None] + D[nxt[g]] * t[:, None]
+    if past_end.any():
+        out[past_end] = D[doff[1:][qpid[past_end]] - 1]
+    return out
+
+
+def redistribute_ragged(P, offsets, closed, preserve_ends=True, eps=1e-9, straight=False):
+    """
+    複数パスを一括で弧長均等化する（utils.redistribute_evenly を各パスに適用したのと同じ結果）。
+    straight=True では各パスの両端を結ぶ直線上に等間隔で並べる（開パス用）。
+    P: (N, D) 連結座標、offsets: (P+1,) 区切り、closed: (P,) bool
+    return: (out (N, D) — 入力と同じ並びの新座標, ok (P,) — 処理できたパス)
+    """
+    P = as_array(P)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    closed = np.asarray(closed, dtype=bool)
+    out = P.copy()
+    num_paths = len(offsets) - 1
+    if num_paths <= 0 or len(P) == 0:
+        return out, np.zeros(max(num_paths, 0), dtype=bool)
+
+    D, doff, idx_map = ragged_dedup(P, offsets, closed, eps=eps)
+    m = np.diff(doff)
+    ok = np.where(closed, m >= 3, m >= 2)
+    pid, local = _ragged_ids(doff)
+
+    if straight:
+        # 始点→終点の線形補間（閉ループは対象外）
+        ok &= ~closed
+        denom = np.maximum(m - 1, 1).astype(np.float64)
+        t = (local / denom[pid])[:, None]
+        new_d = D[doff[:-1][pid]] * (1.0 - t) + D[doff[1:][pid] - 1] * t
+    else:
+        seg, nxt = ragged_segment_lengths(D, doff, closed)
+        cum = ragged_cumulative(seg, doff, closed)
+        ok &= cum[1] > 1e-20
+        new_d = D.copy()
+        sel = ok[pid]
+        if sel.any():
+            qpid = pid[sel]
+            den = np.where(closed, m, m - 1)[qpid].astype(np.float64)
+            dist = local[sel] * (cum[1][qpid] / den)
+            new_d[sel] = ragged_sample_at_distances(D, doff, seg, nxt, closed, dist, qpid, cum=cum)
+            if preserve_ends:
+                op = np.flatnonzero(ok & ~closed)
+                new_d[doff[:-1][op]] = D[doff[:-1][op]]
+                new_d[doff[1:][op] - 1] = D[doff[1:][op] - 1]
+
+    pt_ok = ok[_ragged_ids(offsets)[0]]
+    out[pt_ok] = new_d[idx_map[pt_ok]]
+    return out, ok
+
+
+def _ragged_sum(values, pid, num_paths):
+    return np.bincount(pid, weights=values, minlength=num_paths)
+
+
+class RaggedEqualizer:
+    """
+    弧長均等化の後、弦長のばらつきを反復で補正する（全パス一括）。
+    各反復では弦長の逆比で弧長区間を配分し直し、元の折れ線上で取り直す（常に元の曲線上に乗る）。
+    変動係数が悪化する反復は採用せず、そのパスの補正の強さを半減する。
+
+    反復状態（元の折れ線・現在位置・パスごとの反復回数）を保持するので、
+    run() を回数を増やして呼び直すと増やした分だけ続きから計算する。
+    既に進めた回数より減らした場合は初期状態から計算し直す（途中の位置は保持しない。メモリは点数に比例するだけ）。
+    conv_eps: 弦長の変動係数か最大移動量がこれ未満になったパスは打ち切る（負なら打ち切らない）
+    """
+
+    def __init__(self, P, offsets, closed, conv_eps=-1.0, eps=1e-9):
+        P = as_array(P)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        closed = np.asarray(closed, dtype=bool)
+        self.conv_eps = conv_eps
+        self.num_paths = num_paths = max(len(offsets) - 1, 0)
+        self.P = P
+        self.offsets = offsets
+        self.closed = closed
+        if num_paths == 0 or len(P) == 0:
+            self.ok = np.zeros(num_paths, dtype=bool)
+            self.passes = np.zeros(num_paths, dtype=np.int64)
+            return
+
+        D, doff, idx_map = ragged_dedup(P, offsets, closed, eps=eps)
+        m = np.diff(doff)
+        ok = np.where(closed, m >= 3, m >= 2)
+        pid, local = _ragged_ids(doff)
+        seg, nxt = ragged_segment_lengths(D, doff, closed)
+        cum = ragged_cumulative(seg, doff, closed)
+        total = cum[1]
+        ok &= total > 1e-20
+        nseg = np.where(closed, m, m - 1)
+        op = np.flatnonzero(ok & ~closed)
+
+        self.D, self.doff, self.idx_map = D, doff, idx_map
+        self.pid, self.seg, self.nxt, self.cum, self.total = pid, seg, nxt, cum, total
+        self.ok = ok
+        self.nseg = nseg
+        self.has_seg = local < nseg[pid]
+        self._first_open = doff[:-1][op]
+        self._last_open = doff[1:][op] - 1
+        self._q = np.flatnonzero(ok[pid])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._dist0 = local * (total / np.maximum(nseg, 1))[pid]
+        self._reset()
+
+    def _reset(self):
+        """反復状態を 1 回目のパス（弧長均等化）の直後に戻す"""
+        self.dist = self._dist0
+        self.cur = self._sample(self.dist)
+        self.chord, self.mean, self.cv = self._chord_stats(self.cur)
+        # 補正の強さ（変動係数が悪化したパスは半減して取り直す）
+        self.alpha = np.ones(self.num_paths)
+        self.passes = self.ok.astype(np.int64)
+        # 収束（または停滞）して以後変化しないパス
+        self.done = ~self.ok
+
+    def _sample(self, dist):
+        D = self.D
+        q = self._q
+        pts = D.copy()
+        pts[q] = ragged_sample_at_distances(D, self.doff, self.seg, self.nxt, self.closed, dist[q], self.pid[q], cum=self.cum)
+        pts[self._first_open] = D[self._first_open]
+        pts[self._last_open] = D[self._last_open]
+        return pts
+
+    def _chord_stats(self, pts):
+        pid = self.pid
+        has_seg = self.has_seg
+        chord, _ = ragged_segment_lengths(pts, self.doff, self.closed)
+        cnt = np.maximum(self.nseg, 1).astype(np.float64)
+        mean = _ragged_sum(chord * has_seg, pid, self.num_paths) / cnt
+        dev = np.where(has_seg, chord - mean[pid], 0.0)
+        var = _ragged_sum(dev * dev, pid, self.num_paths) / cnt
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.where(mean > 1e-20, np.sqrt(var) / np.where(mean > 1e-20, mean, 1.0), 0.0)
+        return chord, mean, cv
+
+    def _advance(self, max_iters):
+        """各パスを max_iters 回まで（収束したパスはそこまで）進める"""
+        conv_eps = self.conv_eps
+        pid = self.pid
+        nxt = self.nxt
+        has_seg = self.has_seg
+        total = self.total
+        arange = np.arange(len(self.D))
+        while True:
+            if conv_eps >= 0.0:
+                self.done |= self.cv < conv_eps
+            self.done |= self.alpha <= 1e-3
+            active = ~self.done & (self.passes < max_iters)
+            if not active.any():
+                return
+
+            # 現在の弧長区間（閉ループの末尾は先頭へ回り込む）
+            dist = self.dist
+            chord = self.chord
+            step = np.where(nxt > arange, dist[nxt] - dist, dist[nxt] + total[pid] - dist)
+            step = np.where(has_seg, step, 0.0)
+            good = has_seg & (chord > 1e-20)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(good, self.mean[pid] / np.where(good, chord, 1.0), 1.0)
+                new_step = step * ratio ** self.alpha[pid]
+                scale = total / _ragged_sum(new_step, pid, self.num_paths)
+            new_step *= np.where(np.isfinite(scale), scale, 1.0)[pid]
+            new_dist = np.cumsum(new_step) - new_step
+            # パス先頭の値を引く（末尾の空パスは doff が N を指すので 1 要素足した配列から読む）
+            new_dist -= np.concatenate((new_dist, [0.0]))[self.doff[:-1]][pid]
+
+            new = self._sample(new_dist)
+            n_chord, n_mean, n_cv = self._chord_stats(new)
+            accept = active & cv_improved(n_cv, self.cv)
+            acc_pt = accept[pid]
+            d = new - self.cur
+            disp = np.zeros(self.num_paths)
+            np.maximum.at(disp, pid, np.where(acc_pt, np.sqrt((d * d).sum(axis=1)), 0.0))
+
+            self.dist = np.where(acc_pt, new_dist, dist)
+            self.cur = np.where(acc_pt[:, None], new, self.cur)
+            self.chord = np.where(acc_pt, n_chord, chord)
+            self.mean = np.where(accept, n_mean, self.mean)
+            self.cv = np.where(accept, n_cv, self.cv)
+            self.alpha = np.where(active & ~accept, self.alpha * 0.5, self.alpha)
+            self.passes += active
+            if conv_eps >= 0.0:
+                self.done |= accept & (disp < conv_eps)
+
+    def run(self, max_iters):
+        """
+        max_iters: パスごとの最大パス回数（1 なら弧長均等化のみ = redistribute_ragged と同じ）
+        return: (out (N, D), ok (P,), iters (P,) — 実際に行ったパス回数)
+        """
+        out = self.P.copy()
+        num_paths = self.num_paths
+        if not self.ok.any():
+            return out, self.ok.copy(), np.zeros(num_paths, dtype=np.int64)
+        max_iters = np.broadcast_to(np.asarray(max_iters, dtype=np.int64), (num_paths,))
+        limit = np.maximum(max_iters, 1)
+        if (self.passes > limit).any():
+            # 既に進めた回数より少ない指定：途中の位置は持っていないので最初から
+            self._reset()
+        self._advance(max_iters)
+
+        iters = np.where(self.ok, np.minimum(limit, self.passes), 0)
+        pt_ok = self.ok[_ragged_ids(self.offsets)[0]]
+        out[pt_ok] = self.cur[self.idx_map[pt_ok]]
+        return out, self.ok.copy(), iters
+
+
+def equalize_ragged(P, offsets, closed, max_iters, conv_eps=-1.0, eps=1e-9):
+    """
+    RaggedEqualizer を 1 回だけ使う場合の簡易版。
+    return: (out (N, D), ok (P,), iters (P,) — 実際に行ったパス回数)
+    """
+    return RaggedEqualizer(P, offsets, closed, conv_eps=conv_eps, eps=eps).run(max_iters)
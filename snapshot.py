@@ -0,0 +1,137 @@
+# snapshot.py
+"""
+BMesh の UV 選択状態を 1 パスで平坦な配列へ写し取るスナップショット。
+各オペレータはこの配列（グラフ構築・リサンプル・書き戻し）だけを参照し、
+BMesh の属性アクセスはスキャン時の 1 回に抑える。
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class UVSnapshot:
+    """
+    選択スキャン結果。各配列はスロット（スナップショット内のループ番号）で揃っている。
+    loops  : BMLoop 参照（書き戻し用）
+    face   : 面インデックス
+    corner : 面内でのループ位置（face.loops 上の index）
+    vert   : 頂点インデックス
+    next   : link_loop_next のスロット
+    uv     : (N, 2) UV 座標
+    sel    : UV エッジ選択フラグ
+    checksum : cache.snapshot_checksum が一度だけ計算して保持する
+    NumPy があれば各配列は ndarray、無ければ list。
+    """
+    __slots__ = ("loops", "face", "corner", "vert", "next", "uv", "sel", "checksum", "_uv_list")
+
+    def __init__(self, loops, face, corner, vert, nxt, uv, sel):
+        self.loops = loops
+        self.face = face
+        self.corner = corner
+        self.vert = vert
+        self.next = nxt
+        self.uv = uv
+        self.sel = sel
+        self.checksum = None
+        self._uv_list = None
+
+    def __len__(self):
+        return len(self.loops)
+
+    def uv_list(self):
+        """Python 側で 1 要素ずつ読む用の [[u, v], ...]（初回のみ変換）"""
+        if self._uv_list is None:
+            self._uv_list = self.uv.tolist() if np is not None else self.uv
+        return self._uv_list
+
+    def selected_slots(self):
+        """UV エッジ選択されたループのスロット列（スキャン順）"""
+        if np is not None:
+            return np.flatnonzero(self.sel).tolist()
+        return [i for i, s in enumerate(self.sel) if s]
+
+    def next_list(self):
+        return self.next.tolist() if np is not None else self.next
+
+    def face_corner(self, slot):
+        """(面インデックス, 面内ループ位置) — スプラインのループ識別子"""
+        return int(self.face[slot]), int(self.corner[slot])
+
+
+def uv_edge_select_reader(bm, uv_layer):
+    """
+    Blender 4.5 / 5.x の UV エッジ選択アクセサを 1 回だけ判定する。
+    return: True なら BMLoop.uv_select_edge (5.x)、False なら loop[uv_layer].select_edge (4.5)
+    """
+    for f in bm.faces:
+        for l in f.loops:
+            return hasattr(l, "uv_select_edge")
+    return False
+
+
+def mesh_has_selection(me):
+    """
+    編集モードのメッシュ選択カウンタで選択面の有無を判定する（BMesh を作らずに済む）。
+    UV 同期オフでは UV 選択は選択面上にしか存在しないため、0 ならオブジェクトごと飛ばせる。
+    カウンタが読めない場合は True（従来どおりスキャンする）。
+    """
+    try:
+        return me.total_face_sel > 0
+    except Exception:
+        return True
+
+
+def take_snapshot(bm, uv_layer, selected_only=True):
+    """
+    面のループを 1 パスで走査し UVSnapshot を返す。
+    selected_only=True なら選択面（UV 同期オフで UV エディタに表示される面）だけを対象にし、
+    False なら従来どおり非表示でない全ての面を走査する。
+    selected_only=True でも全ての面の選択フラグを Python で 1 回ずつ調べる絞り込みで、
+    省けるのは選択外の面のループ読み取りだけ（BMesh に選択面だけを辿る API は無い）。
+    確実に効くのは選択の無いオブジェクトを mesh_has_selection で丸ごと飛ばす分で、
+    面ごとの絞り込みの効果は Blender で実測していない（測るには benchmarks/snapshot_scan.py）。
+    頂点インデックスはここで更新しておく。
+    """
+    bm.verts.index_update()
+    bm.faces.index_update()
+    use_loop_attr = uv_edge_select_reader(bm, uv_layer)
+    if selected_only:
+        faces = [f for f in bm.faces if f.select and not f.hide]
+    else:
+        faces = [f for f in bm.faces if not f.hide]
+
+    loops = []
+    face = []
+    corner = []
+    vert = []
+    nxt = []
+    uv = []
+    sel = []
+    for f in faces:
+        fi = f.index
+        base = len(loops)
+        fl = f.loops
+        n = len(fl)
+        for c, l in enumerate(fl):
+            luv = l[uv_layer]
+            loops.append(l)
+            face.append(fi)
+            corner.append(c)
+            vert.append(l.vert.index)
+            nxt.append(base + (c + 1) % n)
+            uv.append(tuple(luv.uv))
+            sel.append(l.uv_select_edge if use_loop_attr else luv.select_edge)
+
+    if np is not None:
+        return UVSnapshot(
+            loops,
+            np.array(face, dtype=np.int32),
+            np.array(corner, dtype=np.int32),
+            np.array(vert, dtype=np.int32),
+            np.array(nxt, dtype=np.int64),
+            np.array(uv, dtype=np.float64).reshape(-1, 2),
+            np.array(sel, dtype=bool),
+        )
+    return UVSnapshot(loops, face, corner, vert, nxt, [list(p) for p in uv], sel)
+
@@ -0,0 +1,154 @@
+# spatial.py
+"""
+折れ線の最近点検索用の区間 BVH。
+区間を折れ線の順番のまま連続範囲で二分し、各ノードに外接矩形を持たせる
+（折れ線の連続区間は空間的にもまとまっているので、並べ替えなしで良い木になる）。
+問い合わせは近い子から深さ優先で辿り、矩形までの距離が現在の最良値を超える枝は刈る。
+結果は全区間を総当たりした場合と同じ規則：最小距離、同距離なら小さい区間番号。
+複数の折れ線をまとめた索引（from_paths）も作れる。区間は折れ線の順に並ぶので、
+同距離なら先の折れ線が優先される。
+"""
+from mathutils import Vector
+
+LEAF_SIZE = 8
+
+
+class PolylineIndex:
+    """
+    samples : 折れ線の点列（Vector など [0], [1] で読めるもの）
+    closed  : True なら末尾→先頭の区間も含める
+    query(p) : (区間番号, 最近点 Vector, 区間内パラメータ t)
+    from_paths で作った索引は query_paths(ps) で (折れ線番号, 区間番号, 最近点, t) を返す
+    """
+    __slots__ = ("num_segments", "_xy", "_segs", "_seg_path", "_nodes", "_first")
+
+    def __init__(self, samples, closed=False):
+        self._xy = []
+        self._segs = []
+        self._seg_path = []  # 区間ごとの (折れ線番号, 折れ線内の区間番号)
+        self._add_path(0, samples, closed, single=False)
+        self._first = self._xy[0] if self._xy else None
+        self._finish()
+
+    @classmethod
+    def from_paths(cls, paths):
+        """paths: [(samples, closed), ...] をまとめた索引。1 点だけの折れ線は長さ 0 の区間として扱う"""
+        index = cls.__new__(cls)
+        index._xy = []
+        index._segs = []
+        index._seg_path = []
+        for k, (samples, closed) in enumerate(paths):
+            index._add_path(k, samples, closed, single=True)
+        index._first = index._xy[0] if index._xy else None
+        index._finish()
+        return index
+
+    def _add_path(self, k, samples, closed, single):
+        base = len(self._xy)
+        self._xy.extend((float(p[0]), float(p[1])) for p in samples)
+        n = len(self._xy) - base
+        segs = [(base + s, base + s + 1) for s in range(n - 1)]
+        if closed and n >= 2:
+            segs.append((base + n - 1, base))
+        if single and n == 1:
+            segs.append((base, base))
+        self._seg_path.extend((k, a - base) for a, _b in segs)
+        self._segs.extend(segs)
+
+    def _finish(self):
+        self.num_segments = len(self._segs)
+        # nodes[i] = (x0, y0, x1, y1, lo, hi, left, right)。葉は left = right = -1
+        self._nodes = []
+        if self._segs:
+            self._build(0, len(self._segs))
+
+    def _build(self, lo, hi):
+        nodes = self._nodes
+        nid = len(nodes)
+        nodes.append(None)
+        if hi - lo <= LEAF_SIZE:
+            xy = self._xy
+            xs = []
+            ys = []
+            for a, b in self._segs[lo:hi]:
+                xs.append(xy[a][0]); xs.append(xy[b][0])
+                ys.append(xy[a][1]); ys.append(xy[b][1])
+            nodes[nid] = (min(xs), min(ys), max(xs), max(ys), lo, hi, -1, -1)
+            return nid
+        mid = (lo + hi) // 2
+        left = self._build(lo, mid)
+        right = self._build(mid, hi)
+        l = nodes[left]
+        r = nodes[right]
+        nodes[nid] = (min(l[0], r[0]), min(l[1], r[1]), max(l[2], r[2]), max(l[3], r[3]), lo, hi, left, right)
+        return nid
+
+    def _segment(self, s, px, py):
+        """区間 s 上の最近点 (d2, qx, qy, t)（総当たり版と同じ式）"""
+        a, b = self._segs[s]
+        ax, ay = self._xy[a]
+        bx, by = self._xy[b]
+        abx = bx - ax
+        aby = by - ay
+        ab2 = abx * abx + aby * aby
+        if ab2 == 0.0:
+            t = 0.0
+            qx, qy = ax, ay
+        else:
+            t = max(0.0, min(1.0, ((px - ax) * abx + (py - ay) * aby) / ab2))
+            qx = ax + t * abx
+            qy = ay + t * aby
+        dx = px - qx
+        dy = py - qy
+        return dx * dx + dy * dy, qx, qy, t
+
+    def query(self, p):
+        px = float(p[0])
+        py = float(p[1])
+        if not self._segs:
+            q = self._first if self._first is not None else (px, py)
+            return 0, Vector(q), 0.0
+        s, qx, qy, t = self._nearest(px, py)
+        return self._segs[s][0], Vector((qx, qy)), t
+
+    def query_paths(self, points):
+        """from_paths の索引で各点の (折れ線番号, 折れ線内の区間番号, 最近点 Vector, t) を返す（区間が無ければ None）"""
+        if not self._segs:
+            return [None] * len(points)
+        out = []
+        seg_path = self._seg_path
+        for p in points:
+            s, qx, qy, t = self._nearest(float(p[0]), float(p[1]))
+            k, local = seg_path[s]
+            out.append((k, local, Vector((qx, qy)), t))
+        return out
+
+    def _nearest(self, px, py):
+        """最近の区間 (区間番号, qx, qy, t)"""
+        nodes = self._nodes
+        best_d2 = None
+        best = None
+        stack = [(0.0, 0)]
+        while stack:
+            lb, nid = stack.pop()
+            if best_d2 is not None and lb > best_d2:
+                continue
+            x0, y0, x1, y1, lo, hi, left, right = nodes[nid]
+            if left < 0:
+                for s in range(lo, hi):
+                    d2, qx, qy, t = self._segment(s, px, py)
+                    if best_d2 is None or d2 < best_d2 or (d2 == best_d2 and s < best[0]):
+                        best_d2 = d2
+                        best = (s, qx, qy, t)
+                continue
+            children = []
+            for c in (left, right):
+                cx0, cy0, cx1, cy1 = nodes[c][:4]
+                dx = max(cx0 - px, 0.0, px - cx1)
+                dy = max(cy0 - py, 0.0, py - cy1)
+                children.append((dx * dx + dy * dy, c))
+            # 近い子を先に調べる（スタックなので後に積む）
+            if children[0][0] <= children[1][0]:
+                children.reverse()
+            stack.extend(children)
+        return best
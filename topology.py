@@ -0,0 +1,317 @@
+# topology.py
+"""
+選択 UV エッジのトポロジー（グラフ構築・連結成分・パス抽出）。
+UV を許容誤差で量子化した int64 キーにまとめ、ノード番号は np.unique の
+逆写像から、エッジは重複を除いた整数ペアとして一括で求める。
+連結成分とパスは CSR 隣接（Topology）上で線形時間に求める。
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_I32_MIN = -(1 << 31)
+_I32_MAX = (1 << 31) - 1
+
+
+def key_scale(tol):
+    """量子化の倍率（従来の uv_key と同じ丸め）"""
+    return int(round(1.0 / max(tol, 1e-12)))
+
+
+def uv_key(v, tol):
+    """単一 UV のキー（タプル）。配列版 quantize_keys と同じ格子"""
+    s = key_scale(tol)
+    return (int(round(v[0] * s)), int(round(v[1] * s)))
+
+
+def quantize_keys(uv, tol):
+    """
+    (N, 2) UV を格子キーへ一括量子化する。
+    両成分が int32 に収まる場合は 1 本の int64 に詰めて返し、収まらない場合は (N, 2) int64 を返す。
+    """
+    s = key_scale(tol)
+    q = np.rint(np.asarray(uv, dtype=np.float64)[:, :2] * s)
+    if len(q) == 0 or (q.min() >= _I32_MIN and q.max() <= _I32_MAX):
+        q = q.astype(np.int64)
+        return (q[:, 0] << 32) | (q[:, 1] & 0xFFFFFFFF)
+    return q.astype(np.int64)
+
+
+def _unique_inverse(keys):
+    """キー配列（1 次元 or (N, 2)）のユニーク数と逆写像"""
+    if keys.ndim == 1:
+        uniq, inv = np.unique(keys, return_inverse=True)
+    else:
+        uniq, inv = np.unique(keys, axis=0, return_inverse=True)
+    return len(uniq), inv.reshape(-1)
+
+
+class UVGraph:
+    """
+    選択 UV エッジのグラフ。ノードは量子化キーごとの整数 ID。
+    edges      : 重複・自己ループを除いた (lo, hi) ペア
+    node_slot  : 各ノードの代表ループ（最初に現れたエッジ端点）のスロット
+    slots(n)   : ノード n に属するエッジ端点ループのスロット（スキャン順、重複あり）
+    """
+    __slots__ = ("num_nodes", "edges", "node_slot", "_slot_ptr", "_slot_idx")
+
+    def __init__(self, num_nodes, edges, node_slot, slot_ptr, slot_idx):
+        self.num_nodes = num_nodes
+        self.edges = edges
+        self.node_slot = node_slot
+        self._slot_ptr = slot_ptr
+        self._slot_idx = slot_idx
+
+    @property
+    def num_edges(self):
+        return len(self.edges)
+
+    def slots(self, node):
+        return self._slot_idx[self._slot_ptr[node]:self._slot_ptr[node + 1]]
+
+    def all_slots(self):
+        """全ノードのエッジ端点ループのスロット（ノード順）"""
+        return self._slot_idx
+
+    def slot_nodes(self):
+        """{スロット: ノード}（エッジ端点ループのみ）"""
+        ptr = self._slot_ptr
+        idx = self._slot_idx
+        out = {}
+        for node in range(self.num_nodes):
+            for p in range(ptr[node], ptr[node + 1]):
+                out[idx[p]] = node
+        return out
+
+
+def build_uv_graph(snap, tol):
+    """
+    スナップショットの選択 UV エッジからグラフを構築する。
+    端点は (選択ループ, その次ループ) を交互に並べた順で扱い、従来の uv_to_loops と同じ出現順を保つ。
+    """
+    if np is None:
+        return _build_uv_graph_py(snap, tol)
+
+    sel = np.flatnonzero(snap.sel)
+    if len(sel) == 0:
+        return UVGraph(0, [], [], [0], [])
+    ends = np.empty(2 * len(sel), dtype=np.int64)
+    ends[0::2] = sel
+    ends[1::2] = snap.next[sel]
+
+    num_nodes, inv = _unique_inverse(quantize_keys(snap.uv[ends], tol))
+    a = inv[0::2]
+    b = inv[1::2]
+    keep = a != b
+    lo = np.minimum(a, b)[keep]
+    hi = np.maximum(a, b)[keep]
+    pair = np.unique(lo * num_nodes + hi)
+    edges = np.stack((pair // num_nodes, pair % num_nodes), axis=1)
+
+    order = np.argsort(inv, kind='stable')
+    slot_ptr = np.concatenate(([0], np.cumsum(np.bincount(inv, minlength=num_nodes))))
+    node_slot = ends[order[slot_ptr[:-1]]]
+    return UVGraph(num_nodes, edges.tolist(), node_slot.tolist(), slot_ptr.tolist(), ends[order].tolist())
+
+
+def _build_uv_graph_py(snap, tol):
+    """NumPy が無い環境用の build_uv_graph"""
+    uv = snap.uv_list()
+    nxt = snap.next_list()
+    ends = []
+    for s in snap.selected_slots():
+        ends.append(s)
+        ends.append(nxt[s])
+    keys = [uv_key(uv[i], tol) for i in ends]
+    ids = {k: i for i, k in enumerate(sorted(set(keys)))}
+    inv = [ids[k] for k in keys]
+    num_nodes = len(ids)
+
+    pairs = set()
+    for i in range(0, len(inv), 2):
+        a, b = inv[i], inv[i + 1]
+        if a != b:
+            pairs.add((a, b) if a < b else (b, a))
+    buckets = [[] for _ in range(num_nodes)]
+    for n, s in zip(inv, ends):
+        buckets[n].append(s)
+    slot_ptr = [0]
+    slot_idx = []
+    for bkt in buckets:
+        slot_idx.extend(bkt)
+        slot_ptr.append(len(slot_idx))
+    node_slot = [bkt[0] for bkt in buckets]
+    return UVGraph(num_nodes, sorted(pairs), node_slot, slot_ptr, slot_idx)
+
+
+class Topology:
+    """
+    CSR 隣接（indptr / indices）による無向グラフ。
+    連結成分は配列ベースの union-find、道（チェーン／サイクル）の抽出は
+    各ノードのカーソルで未使用エッジを辿る線形時間の走査で行う。
+    ノード・近傍は番号順に処理するので、同じ入力からは常に同じパス列（パス ID）が得られる。
+    """
+    __slots__ = ("num_nodes", "indptr", "indices", "edge_ids", "degree", "_labels", "_paths")
+
+    def __init__(self, num_nodes, edges):
+        self.num_nodes = num_nodes
+        self._labels = None
+        self._paths = None
+        if np is not None:
+            e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+            ne = len(e)
+            src = np.concatenate((e[:, 0], e[:, 1]))
+            dst = np.concatenate((e[:, 1], e[:, 0]))
+            eid = np.concatenate((np.arange(ne), np.arange(ne)))
+            order = np.lexsort((dst, src))
+            deg = np.bincount(src, minlength=num_nodes)
+            self.indptr = np.concatenate(([0], np.cumsum(deg))).tolist()
+            self.indices = dst[order].tolist()
+            self.edge_ids = eid[order].tolist()
+            self.degree = deg.tolist()
+        else:
+            adj = [[] for _ in range(num_nodes)]
+            for i, (a, b) in enumerate(edges):
+                adj[a].append((b, i))
+                adj[b].append((a, i))
+            self.indptr = [0]
+            self.indices = []
+            self.edge_ids = []
+            for nb in adj:
+                nb.sort()
+                self.indices.extend(n for n, _ in nb)
+                self.edge_ids.extend(i for _, i in nb)
+                self.indptr.append(len(self.indices))
+            self.degree = [len(nb) for nb in adj]
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def is_simple_cycle(self, nodes):
+        """全ノードが次数 2 の道（＝単純な閉ループ）か"""
+        deg = self.degree
+        return len(nodes) >= 3 and all(deg[n] == 2 for n in nodes)
+
+    def component_labels(self):
+        """各ノードの連結成分番号（最小ノード番号の昇順で 0, 1, ...）"""
+        if self._labels is None:
+            if np is not None:
+                self._labels = self._labels_np()
+            else:
+                self._labels = self._labels_py()
+        return self._labels
+
+    def _labels_np(self):
+        n = self.num_nodes
+        src = np.repeat(np.arange(n), np.diff(self.indptr))
+        dst = np.asarray(self.indices, dtype=np.int64)
+        parent = np.arange(n)
+        # hook: 根を小さい番号の根へ付け替え → pointer jumping で圧縮、を収束まで
+        while True:
+            pa = parent[src]
+            pb = parent[dst]
+            diff = pa != pb
+            if not diff.any():
+                break
+            np.minimum.at(parent, np.maximum(pa, pb)[diff], np.minimum(pa, pb)[diff])
+            while True:
+                pp = parent[parent]
+                if np.array_equal(pp, parent):
+                    break
+                parent = pp
+        _, labels = np.unique(parent, return_inverse=True)
+        return labels.reshape(-1).tolist()
+
+    def _labels_py(self):
+        parent = list(range(self.num_nodes))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        indptr = self.indptr
+        indices = self.indices
+        for a in range(self.num_nodes):
+            for p in range(indptr[a], indptr[a + 1]):
+                ra, rb = find(a), find(indices[p])
+                if ra != rb:
+                    if ra < rb:
+                        parent[rb] = ra
+                    else:
+                        parent[ra] = rb
+        roots = [find(x) for x in range(self.num_nodes)]
+        ids = {}
+        for r in roots:
+            if r not in ids:
+                ids[r] = len(ids)
+        return [ids[r] for r in roots]
+
+    def extract_paths(self):
+        """
+        連結成分ごとに道へ分解する。
+        1) 次数 1 の端点から開パスを回収し、2) 残りのエッジからパス／サイクルを回収する。
+        分岐ノードでは番号の小さい未使用エッジへ進む。
+        return: [(nodes, is_cycle, component), ...]
+                サイクルは始点を末尾にも含む（nodes[0] == nodes[-1]）
+        """
+        if self._paths is not None:
+            return self._paths
+
+        indptr = self.indptr
+        indices = self.indices
+        edge_ids = self.edge_ids
+        deg = self.degree
+        used = [False] * self.num_edges
+        cursor = indptr[:-1]
+
+        def next_slot(c):
+            p = cursor[c]
+            end = indptr[c + 1]
+            while p < end and used[edge_ids[p]]:
+                p += 1
+            cursor[c] = p
+            return p if p < end else -1
+
+        def walk(cur):
+            order = [cur]
+            while True:
+                p = next_slot(cur)
+                if p < 0:
+                    return order
+                used[edge_ids[p]] = True
+                cur = indices[p]
+                order.append(cur)
+
+        labels = self.component_labels()
+        members = [[] for _ in range(max(labels, default=-1) + 1)]
+        for node, comp in enumerate(labels):
+            members[comp].append(node)
+
+        paths = []
+        for comp, nodes in enumerate(members):
+            for s in nodes:
+                if deg[s] != 1 or next_slot(s) < 0:
+                    continue
+                order = walk(s)
+                paths.append((order, False, comp))
+            for a in nodes:
+                while True:
+                    p = next_slot(a)
+                    if p < 0:
+                        break
+                    used[edge_ids[p]] = True
+                    right = walk(indices[p])
+                    left = walk(a)
+                    left.reverse()
+                    order = left + right
+                    is_cycle = len(order) >= 4 and order[0] == order[-1]
+                    paths.append((order, is_cycle, comp))
+        self._paths = paths
+        return paths
@@ -34,6 +34,11 @@ translation_dict = {
         ("*", "Active"): "アクティブ",
         ("*", "Control Point Size"): "制御点の大きさ",
         ("*", "Point Pick Threshold (px)"): "制御点選択しきい値 (px)",
+        ("*", "Drag"): "ドラッグ",
+        ("*", "Fast Drag Preview"): "高速ドラッグプレビュー",
+        ("*", "Curve Tolerance"): "カーブの許容誤差",
+        ("*", "Drag Curve Tolerance"): "ドラッグ中のカーブの許容誤差",
+        ("*", "Drag Update Rate"): "ドラッグ中の更新レート",
 
         # Operators / messages
         ("Operator", "UV Edge Equalize"): "UVエッジを等間隔に配置",
@@ -4,118 +4,21 @@ import bpy
 from mathutils import Vector
 import math
 
-def uv_edge_selected(l, uv_layer):
-    """Blender 4.5〜と5.0以降でUVエッジ選択判定を切り替える"""
-    if hasattr(l, "uv_select_edge"):
-        # Blender 5.x
-        return l.uv_select_edge
-    else:
-        # Blender 4.5.x
-        luv = l[uv_layer]
-        return getattr(luv, "select_edge", False)
-
-def connected_components_keys(graph):
-    """
-    uv_key で構築した無向グラフから、連結成分（セット）を列挙。
-    graph: dict[key, set[key]]
-    return: [set_of_keys, ...]
-    """
-    comps = []
-    visited = set()
-    nodes = set(graph.keys())
-    for nbrs in graph.values():
-        nodes.update(nbrs)
-    for n in nodes:
-        if n in visited:
-            continue
-        stack = [n]
-        comp = set()
-        visited.add(n)
-        while stack:
-            cur = stack.pop()
-            comp.add(cur)
-            for nei in graph.get(cur, ()):
-                if nei not in visited:
-                    visited.add(nei)
-                    stack.append(nei)
-        comps.append(comp)
-    return comps
-
-def extract_paths_from_component(subgraph):
-    """
-    分岐を含む無向グラフ subgraph:{key -> set(nei_keys)} から、
-    (ordered_keys, is_closed) の“道（チェーン／サイクル）”に分解して返す。
-    """
-    paths = []
-    visited_edges = set()
-
-    def ekey(a, b):
-        return (a, b) if a <= b else (b, a)
-
-    def neighbors(k):
-        return subgraph.get(k, set())
-
-    def walk_forward(cur, prev):
-        order = [cur]
-        p = prev
-        c = cur
-        while True:
-            nxts = [n for n in neighbors(c) if ekey(c, n) not in visited_edges and n != p]
-            if not nxts:
-                break
-            n = nxts[0]
-            visited_edges.add(ekey(c, n))
-            order.append(n)
-            p, c = c, n
-        return order
-
-    # 端点（次数1）から開パスを回収
-    endpoints = [k for k, ns in subgraph.items() if len(ns) == 1]
-    for s in endpoints:
-        ns = list(neighbors(s))
-        if not ns:
-            continue
-        n = ns[0]
-        if ekey(s, n) in visited_edges:
-            continue
-        visited_edges.add(ekey(s, n))
-        right = walk_forward(n, s)
-        order = [s] + right
-        paths.append((order, False))
-
-    # 残りエッジからパス／サイクルを回収
-    for a in list(subgraph.keys()):
-        for b in neighbors(a):
-            e = ekey(a, b)
-            if e in visited_edges:
-                continue
-            visited_edges.add(e)
-            right = walk_forward(b, a)
-            left = walk_forward(a, b)
-            order = list(reversed(left)) + [a, b] + right
-            is_closed = (len(order) >= 3 and (order[0] in neighbors(order[-1])))
-            paths.append((order, is_closed))
+from . import resample, snapshot, cache
 
-    return paths
+def _to_vectors(arr):
+    """(N, D) 配列を Vector のリストへ戻す"""
+    return [Vector(row) for row in arr.tolist()]
 
-def gather_welded_uv_loops(loop, uv_layer, key_func):
-    """
-    同じ BMVert で、key_func 丸め後のUV座標が同じ BMLoop 群を列挙。
-    （＝UV上で“同一点に溶接”されているループへ座標を伝播）
-    """
-    target_key = key_func(loop[uv_layer].uv)
-    v = loop.vert
-    group = []
-    for l2 in v.link_loops:
-        luv2 = l2[uv_layer]
-        if key_func(luv2.uv) == target_key:
-            group.append(l2)
-    return group
+def _use_numpy(points):
+    return resample.HAS_NUMPY and len(points) >= resample.NP_MIN_POINTS
 
 def unwrap_cycle01(points):
     """0/1境界を跨ぐ閉ループを一時的に連続空間へ展開"""
     if not points:
         return points[:]
+    if _use_numpy(points):
+        return _to_vectors(resample.unwrap_cycle01(points))
     out = [points[0].copy()]
     acc_u = 0.0
     acc_v = 0.0
@@ -135,6 +38,8 @@ def unwrap_cycle01(points):
 
 def wrap01(points):
     """unwrap_cycle01 した座標を 0..1 に戻す"""
+    if _use_numpy(points):
+        return _to_vectors(resample.wrap01(points))
     out = []
     for p in points:
         out.append(Vector((p.x - round(p.x), p.y - round(p.y))))
@@ -147,6 +52,9 @@ def dedup_with_map(points, closed=False, eps=1e-9):
     閉ループの場合、先頭と末尾が同一点なら末尾を落として idx_map を 0 に張り替える。
     return: (dedup_points, idx_map)
     """
+    if _use_numpy(points):
+        dedup, idx_map = resample.dedup_with_map(points, closed=closed, eps=eps)
+        return _to_vectors(dedup), idx_map.tolist()
     dedup = []
     idx_map = []
     for p in points:
@@ -171,6 +79,9 @@ def redistribute_evenly(points, preserve_ends=True, closed=False, eps=1e-9):
     n0 = len(points)
     if n0 < 2:
         return points[:]
+    if _use_numpy(points):
+        out = resample.redistribute_evenly(points, preserve_ends=preserve_ends, closed=closed, eps=eps)
+        return points[:] if out is None else _to_vectors(out)
 
     # 前処理: 隣接重複の除去
     pts = [points[0]]
@@ -243,6 +154,197 @@ def redistribute_evenly(points, preserve_ends=True, closed=False, eps=1e-9):
 
     return new_pts
 
+def redistribute_ragged(coords, offsets, closed, straight=False, eps=1e-9):
+    """
+    複数パスの一括均等化。
+    coords: 全パスを連結した [(u, v), ...]、offsets: パス区切り (len = パス数 + 1)、
+    closed: パスごとの閉ループ判定。straight=True なら両端を結ぶ直線上に並べる。
+    return: (new_coords, ok) — new_coords は coords と同じ並びの [[u, v], ...]、ok はパスごとの成否
+    """
+    if resample.HAS_NUMPY:
+        out, ok = resample.redistribute_ragged(
+            coords, offsets, closed, preserve_ends=True, eps=eps, straight=straight)
+        return out.tolist(), ok.tolist()
+
+    new_coords = [list(c) for c in coords]
+    ok = []
+    for pi, is_closed in enumerate(closed):
+        s, e = offsets[pi], offsets[pi + 1]
+        pts = [Vector(c) for c in coords[s:e]]
+        dedup, idx_map = dedup_with_map(pts, closed=is_closed, eps=eps)
+        n = len(dedup)
+        if straight:
+            if is_closed or n < 2:
+                ok.append(False)
+                continue
+            step = 1.0 / (n - 1)
+            new_pts = [dedup[0].lerp(dedup[-1], i * step) for i in range(n)]
+        else:
+            if (is_closed and n < 3) or (not is_closed and n < 2):
+                ok.append(False)
+                continue
+            new_pts = redistribute_evenly(dedup, preserve_ends=not is_closed, closed=is_closed)
+        for i in range(e - s):
+            new_coords[s + i] = list(new_pts[idx_map[i]])
+        ok.append(True)
+    return new_coords, ok
+
+def equalize_ragged(coords, offsets, closed, max_iters, conv_eps=-1.0, eps=1e-9, solver=None):
+    """
+    複数パスの反復均等化。1 パス目は redistribute_ragged と同じ弧長均等化で、
+    2 パス目以降は弦長が揃うように元の折れ線上で取り直す。
+    max_iters: パスごとの最大パス回数、conv_eps: 収束判定（変動係数 or 最大移動量、負なら固定回数）
+    solver: equalize_solver() の戻り値。渡すと保持している反復状態から続きを計算する
+    return: (new_coords, ok, iters) — iters はパスごとの実際のパス回数
+    """
+    if solver is not None or resample.HAS_NUMPY:
+        if solver is None:
+            solver = resample.RaggedEqualizer(coords, offsets, closed, conv_eps=conv_eps, eps=eps)
+        out, ok, iters = solver.run(max_iters)
+        return out.tolist(), ok.tolist(), iters.tolist()
+
+    new_coords = [list(c) for c in coords]
+    ok = []
+    iters = []
+    for pi, is_closed in enumerate(closed):
+        s, e = offsets[pi], offsets[pi + 1]
+        pts = [Vector(c) for c in coords[s:e]]
+        dedup, idx_map = dedup_with_map(pts, closed=is_closed, eps=eps)
+        new_pts, used = _equalize_path(dedup, is_closed, max_iters[pi], conv_eps)
+        ok.append(new_pts is not None)
+        iters.append(used)
+        if new_pts is None:
+            continue
+        for i in range(e - s):
+            new_coords[s + i] = list(new_pts[idx_map[i]])
+    return new_coords, ok, iters
+
+def equalize_solver(coords, offsets, closed, conv_eps=-1.0, eps=1e-9):
+    """
+    反復状態を保持する均等化ソルバー（resample.RaggedEqualizer）。
+    solver.run(max_iters) は equalize_ragged と同じ結果を返し、呼び直すと続きから計算する。
+    NumPy が無い場合は None（呼び出し側は equalize_ragged を使う）。
+    """
+    if not resample.HAS_NUMPY:
+        return None
+    return resample.RaggedEqualizer(coords, offsets, closed, conv_eps=conv_eps, eps=eps)
+
+def _sample_at_distances(pts, seg, total, closed, dists):
+    """昇順の弧長 dists で折れ線上の点を取る（redistribute_evenly の sample_at と同じ規則）"""
+    n = len(pts)
+    nseg = len(seg)
+    out = []
+    i = 0
+    acc = 0.0
+    for d in dists:
+        tt = d % total if closed else min(d, total - 1e-12)
+        while i < nseg and acc + seg[i] < tt - 1e-15:
+            acc += seg[i]
+            i += 1
+        if i >= nseg:
+            out.append(pts[-1])
+            continue
+        L = seg[i]
+        local = 0.0 if L <= 1e-20 else (tt - acc) / L
+        out.append(pts[i].lerp(pts[(i + 1) % n], local))
+    return out
+
+def _equalize_path(pts, closed, max_iters, conv_eps):
+    """equalize_ragged の 1 パス分（NumPy が無い場合）。return: (new_pts or None, パス回数)"""
+    n = len(pts)
+    if (closed and n < 3) or (not closed and n < 2):
+        return None, 0
+    seg = _segment_lengths(pts, closed=closed)
+    total = sum(seg)
+    if total <= 1e-20:
+        return None, 0
+    nseg = len(seg)
+
+    def sample(dist):
+        out = _sample_at_distances(pts, seg, total, closed, dist)
+        if not closed:
+            out[0] = pts[0]
+            out[-1] = pts[-1]
+        return out
+
+    dist = [i * (total / nseg) for i in range(n)]
+    cur = sample(dist)
+    cv = _spacing_cv(cur, closed=closed)
+    alpha = 1.0  # 変動係数が悪化したら半減して取り直す
+    used = 1
+    while used < max_iters and alpha > 1e-3:
+        if conv_eps >= 0.0 and cv < conv_eps:
+            break
+        chord = _segment_lengths(cur, closed=closed)
+        mean = sum(chord) / len(chord)
+        steps = [(dist[i + 1] if i + 1 < n else total) - dist[i] for i in range(nseg)]
+        new_steps = [st * (mean / c) ** alpha if c > 1e-20 else st for st, c in zip(steps, chord)]
+        k = total / sum(new_steps) if sum(new_steps) > 0.0 else 1.0
+        new_dist = [0.0]
+        for st in new_steps[:n - 1]:
+            new_dist.append(new_dist[-1] + st * k)
+        new = sample(new_dist)
+        new_cv = _spacing_cv(new, closed=closed)
+        used += 1
+        if not resample.cv_improved(new_cv, cv):
+            alpha *= 0.5
+            continue
+        disp = _max_displacement(cur, new, [True] * n)
+        dist, cur, cv = new_dist, new, new_cv
+        if conv_eps >= 0.0 and disp < conv_eps:
+            break
+    return cur, used
+
+def match_ratio(points_uv, points3, closed=False, straight=False, eps=1e-9):
+    """
+    UV 点列を、対応する 3D 点列の区間長比の位置へ取り直す（Match 3D ratio）。
+    逆写像・累積比・取り直しはいずれも線形（NumPy 版は二分探索）。
+    straight=True なら始点→終点の直線上に比率どおり並べる（開パス用）。
+    return: points_uv と同じ並びの Vector リスト。点数不足・3D 長さ 0 なら None
+    """
+    if _use_numpy(points_uv):
+        out = resample.match_ratio(points_uv, points3, closed=closed, straight=straight, eps=eps)
+        return None if out is None else _to_vectors(out)
+
+    dedup, idx_map = dedup_with_map(points_uv, closed=closed, eps=eps)
+    m = len(dedup)
+    if (closed and m < 3) or (not closed and m < 2):
+        return None
+    first = [None] * m
+    for i, j in enumerate(idx_map):
+        if first[j] is None:
+            first[j] = i
+    aligned = [Vector(points3[0 if i is None else i]) for i in first]
+
+    seg3 = _segment_lengths(aligned, closed=closed)
+    total3 = 0.0
+    for d in seg3:
+        total3 += d
+    if total3 <= 1e-20:
+        return None
+    fracs = [0.0]
+    acc = 0.0
+    for d in seg3[:m - 1 if closed else m - 2]:
+        acc += d
+        fracs.append(acc / total3)
+    if not closed:
+        fracs.append(1.0)
+
+    if straight:
+        a, b = dedup[0], dedup[-1]
+        new_pts = [a.lerp(b, f) for f in fracs]
+    else:
+        seg = _segment_lengths(dedup, closed=closed)
+        total = 0.0
+        for d in seg:
+            total += d
+        if total <= 1e-20:
+            new_pts = dedup
+        else:
+            dists = [((f % 1.0) if closed else max(0.0, min(1.0, f))) * total for f in fracs]
+            new_pts = _sample_at_distances(dedup, seg, total, closed, dists)
+    return [new_pts[j] for j in idx_map]
+
 def _segment_lengths(points, closed=False):
     """連続点列の各区間長を返す"""
     n = len(points)
@@ -295,7 +397,44 @@ def _dedupe_closed(points):
             return points[:-1]
     return points
 
-def sample_polyline(points, resolution=128, curve_type='BEZIER', closed=None):
+# 許容誤差指定時の区間あたり最大分割数
+ADAPTIVE_MAX_STEPS = 256
+
+def _bezier_segments(P, closed):
+    """各区間の (i0, i1, im1, i2)：区間の両端と、ハンドルを決める前後の点のインデックス"""
+    n = len(P)
+    seg_count = n if closed else (n - 1)
+    for i in range(seg_count):
+        i1 = (i + 1) % n if closed else (i + 1)
+        im1 = (i - 1) % n if closed else max(0, i - 1)
+        i2 = (i + 2) % n if closed else min(n - 1, i + 2)
+        yield i, i1, im1, i2
+
+def bezier_flat_steps(p1, h1, h2, p2, tolerance, max_steps=ADAPTIVE_MAX_STEPS):
+    """折れ線近似とベジェ区間の距離が tolerance 以下になる分割数（Wang の式、1..max_steps）"""
+    m = max((p1 - 2.0 * h1 + h2).length, (h1 - 2.0 * h2 + p2).length)
+    if m <= 0.0:
+        return 1
+    return max(1, min(max_steps, int(math.ceil(math.sqrt(0.75 * m / tolerance)))))
+
+def _segment_steps(P, closed, resolution, tolerance):
+    """区間ごとのサンプル数。tolerance 指定時は曲がり具合に応じて、無ければ resolution を均等割り"""
+    segs = list(_bezier_segments(P, closed))
+    if tolerance is None:
+        return [max(2, resolution // max(1, len(segs)))] * len(segs)
+    tol = max(float(tolerance), 1e-9)
+    out = []
+    for i0, i1, im1, i2 in segs:
+        p0, p1, p2, p3 = P[im1], P[i0], P[i1], P[i2]
+        out.append(bezier_flat_steps(p1, p1 + (p2 - p0) / 6.0, p2 - (p3 - p1) / 6.0, p2, tol))
+    return out
+
+def sample_polyline(points, resolution=128, curve_type='BEZIER', closed=None, tolerance=None):
+    """
+    制御点を通る曲線を折れ線にサンプルする。return: (サンプル点列, 弧長比)
+    tolerance を指定すると区間ごとに曲線との距離がそれ以下になるよう分割数を決める
+    （直線に近い区間は少なく、急な曲がりは多く）。無ければ resolution を区間数で均等割りする。
+    """
     if len(points) < 2:
         return points[:], [0.0] * max(1, len(points))
     if closed is None:
@@ -305,19 +444,18 @@ def sample_polyline(points, resolution=128, curve_type='BEZIER', closed=None):
     if curve_type in {'CATMULL_ROM', 'CATMULL_ROM_C'}:
         samples = P[:]
     else:
-        A = P; n = len(A)
-        seg_count = n if closed else (n - 1)
-        for i in range(seg_count):
-            i0 = i
-            i1 = (i + 1) % n if closed else (i + 1)
-            im1 = (i - 1) % n if closed else max(0, i - 1)
-            i2 = (i + 2) % n if closed else min(n - 1, i + 2)
+        steps = _segment_steps(P, closed, resolution, tolerance)
+        if resample.HAS_NUMPY:
+            # 区間ごとの基底行列（キャッシュ済み）で全区間を一括評価
+            S = resample.sample_cardinal_bezier(P, resolution=resolution, closed=closed, steps=steps)
+            return _to_vectors(S), resample.arc_params(S).tolist()
+        A = P
+        for (i0, i1, im1, i2), k in zip(_bezier_segments(A, closed), steps):
             p0, p1, p2, p3 = A[im1], A[i0], A[i1], A[i2]
             h1 = p1 + (p2 - p0) / 6.0
             h2 = p2 - (p3 - p1) / 6.0
-            steps = max(2, resolution // max(1, seg_count))
-            for s in range(steps):
-                t = s / float(steps)
+            for s in range(k):
+                t = s / float(k)
                 samples.append(bezier_cubic(p1, h1, h2, p2, t))
         if not closed:
             samples.append(A[-1].copy())
@@ -332,12 +470,45 @@ def sample_polyline(points, resolution=128, curve_type='BEZIER', closed=None):
     params = [0.0 if total == 0 else L / total for L in lengths]
     return samples, params
 
+def sample_polyline_weights(points, resolution=128, curve_type='BEZIER', closed=None, tolerance=None):
+    """
+    sample_polyline の各サンプルを制御点の線形結合として表した重み。
+    return: サンプルごとの {制御点インデックス: 重み}（サンプル = Σ 重み × points[j]）
+    制御点を動かしても閉判定・重複端点の扱い・区間の分割数が変わらない範囲で sample_polyline と一致する。
+    """
+    n_pts = len(points)
+    if n_pts < 2:
+        return [{j: 1.0} for j in range(n_pts)]
+    if closed is None:
+        closed = _is_closed_points(points)
+    P = _dedupe_closed(points[:]) if closed else points[:]
+    n = len(P)
+    if curve_type in {'CATMULL_ROM', 'CATMULL_ROM_C'}:
+        return [{j: 1.0} for j in range(n)]
+    out = []
+    steps = _segment_steps(P, closed, resolution, tolerance)
+    for (i0, i1, im1, i2), k in zip(_bezier_segments(P, closed), steps):
+        for s in range(k):
+            t = s / float(k)
+            it = 1.0 - t
+            w0, w1, w2, w3 = it**3, 3 * (it**2) * t, 3 * it * (t**2), t**3
+            # h1 = p1 + (p2 - p0) / 6, h2 = p2 - (p3 - p1) / 6 を展開
+            w = {}
+            for j, c in ((im1, -w1 / 6.0), (i0, w0 + w1 + w2 / 6.0), (i1, w1 / 6.0 + w2 + w3), (i2, -w2 / 6.0)):
+                w[j] = w.get(j, 0.0) + c
+            out.append(w)
+    if not closed:
+        out.append({n - 1: 1.0})
+    return out
+
 def resample_by_length(points, count, closed=None):
     if not points:
         return []
     if closed is None:
         closed = _is_closed_points(points)
     P = _dedupe_closed(points[:]) if closed else points[:]
+    if _use_numpy(P):
+        return _to_vectors(resample.resample_by_length(P, count, closed=closed))
     pts = P + ([P[0]] if closed else [])
     cum = [0.0]
     total = 0.0
@@ -364,139 +535,28 @@ def resample_by_length(points, count, closed=None):
         out.append(p)
     return out
 
-def closest_point_on_polyline(samples, p, closed=False):
-    if not samples:
-        return 0, samples[0] if samples else p, 0.0
-    best_dist = 1e20
-    best_point = samples[0]
-    best_t = 0.0
-    best_index = 0
-    seg_count = (len(samples) - 1) + (1 if closed else 0)
-    for s in range(seg_count):
-        i0 = s
-        i1 = (s + 1) % len(samples) if closed else (s + 1)
-        if i1 >= len(samples):
-            continue
-        a = samples[i0]; b = samples[i1]
-        ab = b - a
-        ab2 = ab.length_squared
-        if ab2 == 0.0:
-            proj = a; t = 0.0
-        else:
-            t = max(0.0, min(1.0, (p - a).dot(ab) / ab2))
-            proj = a + t * ab
-        d2 = (p - proj).length_squared
-        if d2 < best_dist:
-            best_dist = d2; best_point = proj; best_t = t; best_index = i0
-    return best_index, best_point, best_t
-
-def _uv_key(v2, tol=1e-6):
-    return (round(v2.x / tol) * tol, round(v2.y / tol) * tol)
-
-def build_all_selected_uv_paths(bm, uv_layer):
-    def _uv_key_graph(v, tol=5e-7):
-        s = int(round(1.0 / max(tol, 1e-12)))
-        return (int(round(v.x * s)), int(round(v.y * s)))
-
-    graph = {}
-    nodes = {}
-    for f in bm.faces:
-        if getattr(f, 'hide', False):
-            continue
-        for l in f.loops:
-            luv = l[uv_layer]
-            ln = l.link_loop_next
-            luvn = ln[uv_layer]
-
-            if uv_edge_selected(l, uv_layer):
-                a = Vector(luv.uv)
-                b = Vector(luvn.uv)
-                ka = _uv_key_graph(a)
-                kb = _uv_key_graph(b)
-                nodes.setdefault(ka, a)
-                nodes.setdefault(kb, b)
-                graph.setdefault(ka, set()).add(kb)
-                graph.setdefault(kb, set()).add(ka)
-
-    if not graph:
+def build_all_selected_uv_paths(bm, uv_layer, snap=None, graph_tol=5e-7, me=None, with_keys=False):
+    """
+    選択 UV エッジのパスを [(点列, 閉ループか), ...] で返す。
+    with_keys=True なら各要素に点列のノード番号列を加えた (点列, 閉ループか, ノード列) を返す。
+    """
+    if snap is None:
+        snap = snapshot.take_snapshot(bm, uv_layer)
+    uv_graph, topo = cache.selection_topology(me, snap, graph_tol)
+    if not uv_graph.num_edges:
         return []
-
-    def _components(g):
-        comps = []
-        visited = set()
-        nodes_all = set(g.keys())
-        for nbrs in g.values():
-            nodes_all.update(nbrs)
-        for n in nodes_all:
-            if n in visited:
-                continue
-            stack = [n]
-            comp = set([n])
-            visited.add(n)
-            while stack:
-                cur = stack.pop()
-                for nei in g.get(cur, ( )):
-                    if nei not in visited:
-                        visited.add(nei)
-                        comp.add(nei)
-                        stack.append(nei)
-            comps.append(comp)
-        return comps
-
-    def _extract_paths(subg):
-        paths = []
-        visited_edges = set()
-        def ekey(a,b):
-            return (a,b) if a <= b else (b,a)
-        def nbrs(k):
-            return subg.get(k, set())
-        def walk_forward(cur, prev):
-            order = [cur]
-            p = prev
-            c = cur
-            while True:
-                nxts = [n for n in nbrs(c) if ekey(c,n) not in visited_edges and n != p]
-                if not nxts:
-                    break
-                n = nxts[0]
-                visited_edges.add(ekey(c,n))
-                order.append(n)
-                p, c = c, n
-            return order
-        endpoints = [k for k, ns in subg.items() if len(ns) == 1]
-        for s in endpoints:
-            ns = list(nbrs(s))
-            if not ns:
-                continue
-            n = ns[0]
-            if ekey(s,n) in visited_edges:
-                continue
-            visited_edges.add(ekey(s,n))
-            right = walk_forward(n, s)
-            order = [s] + right
-            paths.append((order, False))
-        for a in list(subg.keys()):
-            for b in nbrs(a):
-                e = ekey(a,b)
-                if e in visited_edges:
-                    continue
-                visited_edges.add(e)
-                right = walk_forward(b, a)
-                left  = walk_forward(a, b)
-                order = list(reversed(left)) + [a, b] + right
-                deg_vals = [len(subg.get(k,set())) for k in order]
-                is_closed = (len(order) >= 3 and all(d == 2 for d in deg_vals))
-                paths.append((order, is_closed))
-        return paths
+    snap_uv = snap.uv_list()
+    nodes = [Vector(snap_uv[s]) for s in uv_graph.node_slot]
 
     out_paths = []
-    for comp in _components(graph):
-        sub = {k: set(nei for nei in graph.get(k,set()) if nei in comp) for k in comp}
-        for keys_order, is_closed in _extract_paths(sub):
-            if len(set(keys_order)) <= 2:
-                continue
-            pts = [nodes[k] for k in keys_order]
-            out_paths.append((pts, bool(is_closed)))
+    for keys_order, _is_cycle, _comp in topo.extract_paths():
+        if len(set(keys_order)) <= 2:
+            continue
+        pts = [nodes[k] for k in keys_order]
+        if with_keys:
+            out_paths.append((pts, topo.is_simple_cycle(keys_order), keys_order))
+        else:
+            out_paths.append((pts, topo.is_simple_cycle(keys_order)))
 
     return out_paths
 
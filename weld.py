@@ -0,0 +1,102 @@
+# weld.py
+"""
+UV 溶接インデックス。
+頂点ごとに UV を空間ハッシュ（セル幅 = 許容誤差）へ登録し、近傍 3×3 セルの
+実距離判定で「距離が許容誤差以下のループ」を同じグループにまとめる。
+インデックスは書き戻し前に構築し、書き戻しはグループ単位の代入（scatter）で行う。
+"""
+import math
+
+
+class WeldIndex:
+    """
+    groups[gid] : 同じ頂点上で UV 距離が tol 以内に連なるループ群
+    group_of()  : ループからグループ番号を引く（登録時の UV で判定済み）
+    """
+    __slots__ = ("uv_layer", "tol", "groups", "_inv", "_tol2", "_cells", "_loop_gid", "_parent", "_verts")
+
+    def __init__(self, uv_layer, tol):
+        self.uv_layer = uv_layer
+        self.tol = max(float(tol), 1e-12)
+        self.groups = []
+        self._inv = 1.0 / self.tol
+        self._tol2 = self.tol * self.tol
+        self._cells = {}
+        self._loop_gid = {}
+        self._parent = []
+        self._verts = set()
+
+    def _find(self, gid):
+        parent = self._parent
+        while parent[gid] != gid:
+            parent[gid] = parent[parent[gid]]
+            gid = parent[gid]
+        return gid
+
+    def _probe(self, vi, u, w):
+        """(u, w) のセルと、tol 以内にある登録済みエントリのグループ番号（重複なし）"""
+        cx = math.floor(u * self._inv)
+        cy = math.floor(w * self._inv)
+        found = []
+        cells = self._cells
+        tol2 = self._tol2
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for eu, ew, gid in cells.get((vi, cx + dx, cy + dy), ()):
+                    du = eu - u
+                    dw = ew - w
+                    if du * du + dw * dw <= tol2:
+                        gid = self._find(gid)
+                        if gid not in found:
+                            found.append(gid)
+        return cx, cy, found
+
+    def add_vert(self, v):
+        """頂点 v の link_loops を 1 回だけ走査して登録（登録済みなら何もしない）"""
+        vi = v.index
+        if vi in self._verts:
+            return
+        self._verts.add(vi)
+        uv_layer = self.uv_layer
+        for l in v.link_loops:
+            uv = l[uv_layer].uv
+            u, w = float(uv[0]), float(uv[1])
+            cx, cy, found = self._probe(vi, u, w)
+            if not found:
+                gid = len(self.groups)
+                self.groups.append([])
+                self._parent.append(gid)
+            else:
+                # 複数グループを橋渡しする点なら 1 つに統合
+                gid = min(found)
+                for other in found:
+                    if other != gid:
+                        self._parent[other] = gid
+                        self.groups[gid].extend(self.groups[other])
+                        self.groups[other] = []
+            self.groups[gid].append(l)
+            self._cells.setdefault((vi, cx, cy), []).append((u, w, gid))
+            self._loop_gid[l] = gid
+
+    def group_of(self, loop):
+        """loop の属するグループ番号"""
+        self.add_vert(loop.vert)
+        return self._find(self._loop_gid[loop])
+
+    def scatter(self, gid, uv):
+        """グループ gid の全ループへ UV を代入"""
+        uv_layer = self.uv_layer
+        for l in self.groups[gid]:
+            l[uv_layer].uv = uv
+
+
+def build_weld_index(snap, uv_layer, slots, tol):
+    """
+    スナップショットのスロット群が触れる頂点について WeldIndex を構築する。
+    書き戻しで UV が変わる前に呼ぶこと。
+    """
+    index = WeldIndex(uv_layer, tol)
+    loops = snap.loops
+    for s in slots:
+        index.add_vert(loops[s].vert)
+    return index